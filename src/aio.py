@@ -0,0 +1,37 @@
+"""Logging from asyncio code, without ever blocking the event loop on output."""
+
+# Standard libs:
+import asyncio
+
+# Our libs:
+from . import logworks
+
+
+# Classes:
+class AsyncLogger(logworks.Logger):
+    """A Logger() for asyncio code. Its level methods (ok() included) only queue the record, which is
+    written by a background thread (see BackgroundHandler), so they never block the event loop.
+    The default 'overflow' policy is "drop_oldest", as blocking the loop is what we want to avoid.
+    Accepts all other Logger() arguments.
+    """
+
+    # Constructor:
+    def __init__(self, queue_size=10000, overflow="drop_oldest", **kwargs):
+        super().__init__(async_io=True, queue_size=queue_size, overflow=overflow, **kwargs)
+
+    # Public methods:
+    async def flush(self):
+        """Wait (without blocking the loop) until everything logged so far has been written."""
+
+        await asyncio.get_running_loop().run_in_executor(None, super().flush)
+
+    async def aclose(self):
+        """Like close(), without blocking the loop."""
+
+        await asyncio.get_running_loop().run_in_executor(None, super().close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
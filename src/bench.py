@@ -0,0 +1,204 @@
+"""Benchmarks for logworks. Run with:
+
+    python -m logworks.bench [-n NUMBER] [-o results.json]
+
+Results are printed (or saved) as JSON: per-call cost of formatters, and of each level method of
+ConsoleLogger() and FileLogger() (enabled and disabled, with and without colors, with default and
+custom formatter, each compiled or not), next to that of a bare logging.Logger, as baseline.
+"""
+
+# Standard libs:
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+import contextlib
+import tracemalloc
+
+# Our libs:
+from . import logworks
+
+
+# Globals:
+DEFAULT_NUMBER = 20000
+LEVELS = ("debug", "info", "ok", "warning", "error")
+CUSTOM_FORMAT = "{asctime} {clevelname} {name}: {message}"
+MESSAGE = "Some message, of average length for a log line"
+
+
+# Functions:
+def time_per_call(func, number=DEFAULT_NUMBER):
+    """Return average time (in ns) taken by a call to 'func'."""
+
+    start = time.perf_counter_ns()
+    for _ in range(number):
+        func()
+
+    return (time.perf_counter_ns() - start) / number
+
+
+def allocations_per_call(func, number=DEFAULT_NUMBER):
+    """Return dict with memory allocated by calls to 'func': peak size (in bytes) of the memory
+    traced while calling it 'number' times, and average memory blocks left allocated per call.
+    """
+    func()  # warm up any cache
+    tracemalloc.start()
+    try:
+        blocks = sys.getallocatedblocks()
+        for _ in range(number):
+            func()
+        blocks = sys.getallocatedblocks() - blocks
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "peak_bytes": peak,
+        "blocks_per_call": blocks / number,
+    }
+
+
+def measure(func, number=DEFAULT_NUMBER):
+    """Return dict with time and allocations per call to 'func'."""
+
+    result = {"ns_per_call": time_per_call(func, number)}
+    result.update(allocations_per_call(func, max(number // 10, 1)))
+
+    return result
+
+
+def make_record(message=MESSAGE):
+    """Return a LogRecord, as produced by a Logger()."""
+
+    record = logging.LogRecord("logworks.bench", logging.INFO, __file__, 0, message, None, None)
+    record.clevelname = logworks.Logger.colorize("[INFO]", 34)
+
+    return record
+
+
+def bench_formatters(number=DEFAULT_NUMBER):
+    """Return ns/call of each formatter, for default logworks templates."""
+
+    record = make_record()
+    results = {}
+    for name, template in (("console", logworks.DEFAULT_CONSOLE_FORMAT),
+                           ("file", logworks.DEFAULT_FILE_FORMAT)):
+        stdlib = logging.Formatter(template, logworks.DEFAULT_DATE_FORMAT, style="{")
+        compiled = logworks.get_formatter(format=template, compiled=True)
+        cached = logworks.get_formatter(format=template)
+        results[name] = {
+            "stdlib": time_per_call(lambda: stdlib.format(record), number),
+            "cached_time": time_per_call(lambda: cached.format(record), number),
+            "compiled": time_per_call(lambda: compiled.format(record), number),
+        }
+
+    return results
+
+
+def scenarios(devnull, logfile):
+    """Yield (description, logger, methods) for each scenario to benchmark. The 'logger' must be
+    set to each level, and closed after use. Console output goes to 'devnull', file output to 'logfile'.
+    """
+    # Baseline:
+    for output in ("console", "file"):
+        logger = logging.getLogger("logworks.bench.logging." + output)
+        logger.propagate = False
+        if output == "console":
+            handler = logging.StreamHandler(devnull)
+        else:
+            handler = logging.FileHandler(logfile)
+        handler.setFormatter(
+            logging.Formatter(logworks.DEFAULT_FILE_FORMAT, logworks.DEFAULT_DATE_FORMAT, style="{"))
+        logger.addHandler(handler)
+        methods = {which: getattr(logger, "info" if which == "ok" else which) for which in LEVELS}
+
+        description = {"logger": "logging", "output": output, "color": False, "formatter": "default",
+                       "compiled": False}
+
+        yield description, logger, methods
+
+        logger.removeHandler(handler)
+        handler.close()
+
+    # ConsoleLogger and FileLogger:
+    for output in ("console", "file"):
+        for color in ((True, False) if output == "console" else (False,)):
+            for formatter in ("default", "custom"):
+                for compiled in (False, True):
+                    name = "logworks.bench.{o}.{c}.{f}.{p}".format(o=output, c=color, f=formatter, p=compiled)
+                    if formatter == "custom":
+                        template = CUSTOM_FORMAT
+                    elif output == "console":
+                        template = logworks.DEFAULT_CONSOLE_FORMAT
+                    else:
+                        template = logworks.DEFAULT_FILE_FORMAT
+                    fmt = logworks.get_formatter(format=template, compiled=compiled)
+
+                    if output == "console":
+                        with contextlib.redirect_stderr(devnull):
+                            logger = logworks.ConsoleLogger(
+                                which_logger=name, use_color=color, console_formatter=fmt)
+                    else:
+                        logger = logworks.FileLogger(logfile=logfile, which_logger=name, file_formatter=fmt)
+                    logger.logger.propagate = False
+
+                    description = {"logger": type(logger).__name__, "output": output, "color": color,
+                                   "formatter": formatter, "compiled": compiled}
+
+                    yield description, logger, None
+
+                    logger.close()
+
+
+def bench_loggers(number=DEFAULT_NUMBER):
+    """Return list of dicts, one per (scenario, level, enabled or not), with per call measurements."""
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmpdir, open(os.devnull, "w") as devnull:
+        logfile = os.path.join(tmpdir, "bench.log")
+        for description, logger, methods in scenarios(devnull, logfile):
+            for enabled in (True, False):
+                level = logging.DEBUG if enabled else logging.CRITICAL
+                if methods is None:  # a logworks Logger()
+                    logger.set_level(level)
+                else:
+                    logger.setLevel(level)
+
+                for which in LEVELS:
+                    method = methods[which] if methods else getattr(logger, which)
+                    row = dict(description, level=which, enabled=enabled)
+                    row.update(measure(lambda: method(MESSAGE), number))
+                    results.append(row)
+
+    return results
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Benchmark logworks.")
+    parser.add_argument("-n", "--number", type=int, default=DEFAULT_NUMBER,
+                        help="Calls per measurement. Default: {n}.".format(n=DEFAULT_NUMBER))
+    parser.add_argument("-o", "--output",
+                        help="Save results to this file, instead of printing them.")
+    opts = parser.parse_args(args)
+
+    results = {
+        "logworks": logworks.__version__,
+        "python": sys.version.split()[0],
+        "number": opts.number,
+        "formatters": bench_formatters(opts.number),
+        "loggers": bench_loggers(opts.number),
+    }
+
+    text = json.dumps(results, indent=2)
+    if opts.output:
+        with open(opts.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Read back log files written in binary by FileLogger(binary=True) (see logworks.BinaryFile), and
+export them as text, exactly as DEFAULT_FILE_FORMATTER (or any other formatter) would have written them:
+
+    python -m logworks.binary jobs.lwb [-o jobs.log]
+"""
+
+# Standard libs:
+import sys
+import logging
+import argparse
+
+# Our libs:
+from . import logworks
+
+
+# Functions:
+def records(path, encoding="utf-8"):
+    """Yield a LogRecord for each record in binary log file 'path', as make_record() would build it.
+    A truncated last record (still being written) is ignored.
+    """
+    with open(path, "rb") as f:
+        magic = f.read(len(logworks.BINARY_MAGIC))
+        if magic != logworks.BINARY_MAGIC:
+            raise ValueError("'{p}' is not a logworks binary log file".format(p=path))
+
+        names = {}  # string id -> logger name
+        rest_of_string = logworks.BINARY_STRING.size - 1
+        rest_of_record = logworks.BINARY_RECORD.size - 1
+        while True:
+            kind = f.read(1)
+            if kind == b"\x00":
+                header = kind + f.read(rest_of_string)
+                if len(header) < logworks.BINARY_STRING.size:
+                    return
+                _, string_id, length = logworks.BINARY_STRING.unpack(header)
+                names[string_id] = f.read(length).decode(encoding)
+            elif kind == b"\x01":
+                header = kind + f.read(rest_of_record)
+                if len(header) < logworks.BINARY_RECORD.size:
+                    return
+                _, created, level, name_id, length = logworks.BINARY_RECORD.unpack(header)
+                message = f.read(length)
+                if len(message) < length:
+                    return
+                yield _record(names[name_id], created, level, message.decode(encoding))
+            elif not kind:
+                return
+            else:
+                raise ValueError("Corrupt binary log file '{p}', at byte {b}".format(p=path, b=f.tell() - 1))
+
+
+def export(path, output, formatter=logworks.DEFAULT_FILE_FORMATTER, encoding="utf-8"):
+    """Write all records in binary log file 'path' to text stream 'output', formatted with
+    'formatter'. Return number of records.
+    """
+    count = 0
+    for record in records(path, encoding):
+        output.write(formatter.format(record) + "\n")
+        count += 1
+
+    return count
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Export logworks binary log files as text.")
+    parser.add_argument("path", help="Binary log file.")
+    parser.add_argument("-o", "--output", help="Write to this file, instead of standard output.")
+    parser.add_argument("-t", "--template", default=logworks.DEFAULT_FILE_FORMAT,
+                        help="Template to format records with. Default: '{t}'.".format(
+                            t=logworks.DEFAULT_FILE_FORMAT))
+    opts = parser.parse_args(args)
+
+    formatter = logworks.get_formatter(format=opts.template, compiled=True)
+    if opts.output:
+        with open(opts.output, "w") as output:
+            export(opts.path, output, formatter)
+    else:
+        export(opts.path, sys.stdout, formatter)
+
+
+def _record(name, created, level, message):
+    """Return LogRecord out of the fields of a binary record."""
+
+    if level == logworks.BINARY_OK_LEVEL:
+        levelno, which = logging.INFO, "ok"
+    else:
+        levelno, which = level, logging.getLevelName(level).lower()
+
+    seconds, ns = divmod(created, 1000000000)
+    created = seconds + (ns // 1000) / 1e6  # never rounds up to the next second
+
+    return logworks.make_record(name, levelno, which, created, message, msecs=ns // 1000000)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""Sidecar index of log files written with the default file format ("{asctime} [{levelname}] {message}"),
+to jump straight to the records of a time range (and level) instead of scanning the whole file.
+
+The index of "jobs.log" is "jobs.log.lwidx": a header, and one entry per time bucket (of 'bucket'
+seconds), with the byte offset of its first record, and the levels seen in it. It is built, or
+brought up to date with the records appended since, with:
+
+    python -m logworks.index update jobs.log [--bucket SECONDS]
+
+which is cheap enough to run periodically while the file is being written. Then, query with:
+
+    python -m logworks.index query jobs.log --start "2026-10-17 14:00:00" --end "2026-10-17 14:05:00" --level ERROR
+"""
+
+# Standard libs:
+import os
+import re
+import sys
+import mmap
+import array
+import itertools
+import bisect
+import zlib
+import struct
+import argparse
+
+# Our libs:
+from . import reader
+
+
+# Globals:
+SUFFIX = ".lwidx"
+DEFAULT_BUCKET = 10  # seconds
+MAGIC = b"LWIDX\x00\x00\x02"
+# Magic, bucket (s), bytes of log file indexed, and CRC-32 of the first (up to) FINGERPRINT_SIZE bytes
+# of the log file, and how many: a new file (e.g. after a rotation) is told apart by its first record:
+HEADER = struct.Struct("<8sqqII")
+FINGERPRINT_SIZE = 64
+ENTRY = struct.Struct("<qqq")  # bucket start (s since epoch), offset of its first record, level bits
+LEVEL_BITS = {"DEBUG": 1, "INFO": 2, "WARNING": 4, "ERROR": 8, "CRITICAL": 16}
+OTHER_LEVEL = 32
+
+# Start of a record (lines not matching it continue the previous record):
+RECORD_START = re.compile(rb"(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)(?:,\d{3})? \[([A-Za-z]+)\] ")
+RECORD_LINE = re.compile(b"\n" + RECORD_START.pattern)  # to find them all in one go
+_LEVEL_BITS = {name.encode("ascii"): bit for name, bit in LEVEL_BITS.items()}
+
+
+# Functions:
+def index_path(path):
+    """Return the path of the index of log file 'path'."""
+
+    return path + SUFFIX
+
+
+def level_bits(levels):
+    """Return the level bits matching any of 'levels' (names, as in the file), or all if None."""
+
+    if levels is None:
+        return -1
+
+    bits = 0
+    for level in levels:
+        bits |= LEVEL_BITS.get(level.upper(), OTHER_LEVEL)
+
+    return bits
+
+
+def update(path, bucket=DEFAULT_BUCKET):
+    """Bring index of log file 'path' up to date, indexing only what was appended since last time
+    (or everything, if there is no index yet, it was built with another 'bucket', or the log file is
+    not the one indexed, e.g. after a rotation). Only complete lines are indexed. Return the number of entries.
+    """
+    ipath = index_path(path)
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        head = f.read(FINGERPRINT_SIZE)
+    fingerprint = (zlib.crc32(head), len(head))
+
+    header = None
+    if os.path.isfile(ipath):
+        with open(ipath, "rb") as f:
+            header = f.read(HEADER.size)
+        if len(header) == HEADER.size:
+            magic, indexed_bucket, indexed, crc, length = HEADER.unpack(header)
+            if (magic != MAGIC or indexed_bucket != bucket or indexed > size or
+                    length > len(head) or zlib.crc32(head[:length]) != crc):
+                header = None
+        else:
+            header = None
+
+    if header is None:
+        with open(ipath, "wb") as f:
+            f.write(HEADER.pack(MAGIC, bucket, 0, *fingerprint))
+        indexed = 0
+
+    with open(ipath, "r+b") as f_index:
+        last = None  # (bucket start, offset, bits) of the last entry, still open to more records
+        count = (os.fstat(f_index.fileno()).st_size - HEADER.size) // ENTRY.size
+        if count:
+            f_index.seek(HEADER.size + (count - 1) * ENTRY.size)
+            last = ENTRY.unpack(f_index.read(ENTRY.size))
+            count -= 1
+
+        if size > indexed:
+            with open(path, "rb") as f_log, mmap.mmap(f_log.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                end = data.rfind(b"\n", indexed, size) + 1
+                entries, last, indexed = _index_range(data, indexed, max(end, indexed), bucket, last)
+        else:
+            entries = []
+
+        f_index.seek(HEADER.size + count * ENTRY.size)
+        for entry in entries + ([last] if last else []):
+            f_index.write(ENTRY.pack(*entry))
+        f_index.seek(0)
+        f_index.write(HEADER.pack(MAGIC, bucket, indexed, *fingerprint))
+
+    return count + len(entries) + (1 if last else 0)
+
+
+def search(path, start=None, end=None, levels=None, refresh=True):
+    """Yield (offset, created, levelname, text) for each record of log file 'path' created between
+    'start' (included) and 'end' (excluded), as seconds since epoch, with a level in 'levels' (names,
+    as in the file: "ERROR"...). Any of them None means no limit. Multi-line records are returned
+    whole, with no trailing newline. Only the parts of the file the index points to are read (through
+    mmap). If 'refresh', the index is updated (or built) first, with the bucket it already has.
+    """
+    if refresh:
+        update(path, bucket=_indexed_bucket(path))
+
+    wanted = level_bits(levels)
+    with open(index_path(path), "rb") as f:
+        magic, bucket, indexed, _, _ = HEADER.unpack(f.read(HEADER.size))
+        flat = array.array("q")
+        flat.frombytes(f.read())
+
+    buckets, offsets, bits = flat[0::3], flat[1::3], flat[2::3]
+
+    # Entries whose bucket overlaps the range (plus the next one, which might hold some late records):
+    first = 0 if start is None else max(bisect.bisect_right(buckets, start) - 1, 0)
+    last = len(buckets) if end is None else min(bisect.bisect_left(buckets, end) + 1, len(buckets))
+
+    with open(path, "rb") as f_log:
+        if os.fstat(f_log.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f_log.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for begin, stop in _ranges(offsets, bits, first, last, wanted, min(indexed, len(data))):
+                for record in _records(data, begin, stop):
+                    _, created, levelname, _ = record
+                    if start is not None and created < start:
+                        continue
+                    if end is not None and created >= end:
+                        continue
+                    if level_bits([levelname]) & wanted:
+                        yield record
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Index log files, and query them through the index.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("update", help="Build the index of a log file, or bring it up to date.")
+    command.add_argument("path", help="Log file.")
+    command.add_argument("-b", "--bucket", type=int, default=DEFAULT_BUCKET,
+                         help="Seconds per index entry. Default: {b}.".format(b=DEFAULT_BUCKET))
+
+    command = commands.add_parser("query", help="Print the records of a time range, and level.")
+    command.add_argument("path", help="Log file.")
+    command.add_argument("-s", "--start", help='Local time, as "YYYY-mm-dd HH:MM:SS". Default: no limit.')
+    command.add_argument("-e", "--end", help='Local time, as "YYYY-mm-dd HH:MM:SS". Default: no limit.')
+    command.add_argument("-l", "--level", action="append",
+                         help="Only records of this level (can be given many times). Default: all.")
+
+    opts = parser.parse_args(args)
+
+    if opts.command == "update":
+        entries = update(opts.path, opts.bucket)
+        print("{p}: {n} entries".format(p=index_path(opts.path), n=entries))
+        return
+
+    start = reader.parse_time(opts.start) if opts.start else None
+    end = reader.parse_time(opts.end) if opts.end else None
+    for _, _, _, text in search(opts.path, start, end, opts.level):
+        sys.stdout.write(text + "\n")
+
+
+def _indexed_bucket(path):
+    """Return bucket of the index of 'path', or DEFAULT_BUCKET if none."""
+
+    try:
+        with open(index_path(path), "rb") as f:
+            magic, bucket, _, _, _ = HEADER.unpack(f.read(HEADER.size))
+    except (OSError, struct.error):
+        return DEFAULT_BUCKET
+
+    return bucket if magic == MAGIC else DEFAULT_BUCKET
+
+
+def _index_range(data, begin, end, bucket, last):
+    """Index records of 'data' between offsets 'begin' and 'end', continuing from 'last' entry.
+    Return (closed entries, still open last entry, offset indexed up to).
+    """
+    if begin == 0:  # no newline before the first record
+        first = RECORD_START.match(data, 0, end)
+        matches = itertools.chain([first] if first else [], RECORD_LINE.finditer(data, 0, end))
+    else:
+        matches = RECORD_LINE.finditer(data, begin - 1, end)
+
+    entries = []
+    start, offset, bits = last or (None, None, 0)
+    stamp = None
+    for found in matches:
+        text, level = found.groups()
+        if text != stamp:  # records of the same second go to the same bucket
+            stamp = text
+            bucket_start = int(reader.parse_time(text.decode("ascii")) // bucket) * bucket
+            if start is None or bucket_start > start:
+                if start is not None:
+                    entries.append((start, offset, bits))
+                start, offset, bits = bucket_start, found.start(1), 0
+        bits |= _LEVEL_BITS.get(level, OTHER_LEVEL)  # records logged late go to the current bucket
+
+    if start is not None:
+        last = (start, offset, bits)
+
+    return entries, last, end
+
+
+def _ranges(offsets, bits, first, last, wanted, size):
+    """Yield (begin, end) byte ranges covering entries 'first' to 'last' with any of the 'wanted'
+    level bits, merging contiguous ones. The last entry of all extends to 'size'.
+    """
+    begin = None
+    for i in range(first, last):
+        if bits[i] & wanted:
+            if begin is None:
+                begin = offsets[i]
+        elif begin is not None:
+            yield begin, offsets[i]
+            begin = None
+
+    if begin is not None:
+        yield begin, offsets[last] if last < len(offsets) else size
+
+
+def _records(data, begin, end):
+    """Yield (offset, created, levelname, text) for each record starting in 'data' between 'begin'
+    and 'end'. Lines not looking like the start of a record are appended to the previous one.
+    """
+    match = RECORD_START.match
+    record = None
+    pos = begin
+    while pos < end:
+        eol = data.find(b"\n", pos, end)
+        if eol < 0:
+            eol = end
+
+        found = match(data, pos, eol)
+        if found:
+            if record is not None:
+                yield _record(data, *record)
+            record = (pos, eol, reader.parse_time(found.group(1).decode("ascii")), found.group(2).decode("ascii"))
+        elif record is not None:
+            record = (record[0], eol, record[2], record[3])
+
+        pos = eol + 1
+
+    if record is not None:
+        yield _record(data, *record)
+
+
+def _record(data, begin, end, created, levelname):
+    return begin, created, levelname, data[begin:end].decode("utf-8", "replace")
+
+
+if __name__ == "__main__":
+    main()
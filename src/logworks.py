@@ -1,133 +1,1876 @@
 # Standard libs:
+import os
+import re
+import sys
 import json
+import time
 import logging
-import pkg_resources
-
-# Version:
-try:
-    __version__ = pkg_resources.get_distribution("logworks").version
-except pkg_resources.DistributionNotFound:  # pkg not installed
-    __version__ = None
-
-# Globals:
-DEFAULT_CONSOLE_FORMATTER = logging.Formatter(
-    fmt='{asctime} {clevelname} {message}',
-    datefmt="%Y-%m-%d %H:%M:%S",
-    style="{"
+import string
+import struct
+import keyword
+import weakref
+import threading
+import contextlib
+import collections
+from types import MappingProxyType
+
+
+# Version (resolved on first access, to keep the import of logworks cheap):
+def __getattr__(name):
+    """Return module attribute 'name'. Only '__version__' is computed here, once."""
+
+    if name != "__version__":
+        raise AttributeError("module {m!r} has no attribute {n!r}".format(m=__name__, n=name))
+
+    from importlib import metadata
+
+    try:
+        version = metadata.version("logworks")
+    except metadata.PackageNotFoundError:  # pkg not installed
+        version = None
+
+    globals()["__version__"] = version
+
+    return version
+
+
+# Globals (DEFAULT_CONSOLE_FORMATTER and DEFAULT_FILE_FORMATTER are defined after Formatter):
+DEFAULT_CONSOLE_FORMAT = '{asctime} {clevelname} {message}'
+DEFAULT_FILE_FORMAT = '{asctime} [{levelname}] {message}'
+DEFAULT_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+DEFAULT_CONF = {
+    "colorize": True,
+    "logfile": "logworks.log",
+    "colors": {
+        "debug": 37,
+        "info": 34,
+        "warning": 33,
+        "error": 31,
+        "name": 36,
+        "ok": 32,
+    }
+}
+LEVEL_TAGS = (
+    ("debug", "[DEBUG]"),
+    ("info", "[INFO]"),
+    ("ok", "[OK]"),
+    ("warning", "[WARNING]"),
+    ("error", "[ERROR]"),
+)
+LEVEL_NUMBERS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "ok": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+}
+OVERFLOW_POLICIES = ("block", "drop_oldest", "drop_debug")
+COMPRESSIONS = {  # compression method -> (module, file extension)
+    "gzip": ("gzip", ".gz"),
+    "lzma": ("lzma", ".xz"),
+}
+
+# Binary log format (see BinaryFile; the binary module reads it back). After the magic bytes, a
+# sequence of string definitions (kind 0), giving an id to a logger name, and records (kind 1):
+BINARY_MAGIC = b"LWBIN\x00\x00\x01"
+BINARY_STRING = struct.Struct("<BII")  # kind, string id, length of the UTF-8 string following
+BINARY_RECORD = struct.Struct("<BqBII")  # kind, time (ns since epoch), level, name id, length of the UTF-8 message
+BINARY_OK_LEVEL = 255  # level of OK records (that of the others is their levelno)
+_EXC_FORMATTER = logging.Formatter()  # formats exceptions for it
+
+# JSON lines output (see JsonFormatter):
+JSON_TIME_FORMATS = ("iso", "epoch")
+_JSON_ENCODE = json.encoder.encode_basestring  # C accelerated, if available
+
+# Live Logger() instances, by name of the logging.Logger they use. Maps name -> WeakSet:
+_INSTANCES = {}
+_INSTANCES_LOCK = threading.Lock()
+
+# Names Logger.bind() fields can't take, as LogRecord (or Formatter, or we) already use them:
+RESERVED_FIELDS = frozenset(logging.makeLogRecord({}).__dict__) | {"message", "asctime", "clevelname",
+                                                                    "lwlevel", "lwbound"}
+_NOT_CACHED = (None, None)  # extras of a BoundLogger, before first use
+
+# Handlers attached to logging.Logger objects, shared by all Logger() instances asking for the same
+# logger name, output target and formatter. Maps key -> [handler, number of Logger() using it]:
+_HANDLERS = {}
+_HANDLERS_LOCK = threading.Lock()
+
+# Log files, shared by all handlers writing to the same absolute path. Maps path -> SharedFile:
+_FILES = {}
+_FILES_LOCK = threading.Lock()
+
+# Configuration files read, shared by all Logger() reading them (read-only, see _frozen()).
+# Maps absolute path -> (mtime, conf):
+_CONFS = {}
+
+# Configuration files checked for changes every RELOAD_INTERVAL seconds (see Logger(hot_reload=True)).
+# Maps absolute path -> WeakSet of Logger() using it:
+RELOAD_INTERVAL = 2.0
+_WATCHED = {}
+_WATCHED_LOCK = threading.Lock()
+_WATCHER = None  # thread checking them
+
+
+# Functions:
+def get_formatter(format=DEFAULT_CONSOLE_FORMAT, date_format=DEFAULT_DATE_FORMAT, compiled=False):
+    """Helper to produce a custom logging format.
+    If 'compiled', return a CompiledFormatter, which produces the same output faster.
+    """
+    if compiled:
+        return CompiledFormatter(fmt=format, datefmt=date_format)
+
+    return Formatter(
+        fmt=format,
+        datefmt=date_format,
+    )
+
+
+def get_json_formatter(time_format="iso"):
+    """Helper to produce a JSON lines formatter (see JsonFormatter), with times as ISO 8601 local
+    times ('time_format' "iso") or seconds since epoch ("epoch").
+    """
+    return JsonFormatter(time_format=time_format)
+
+
+def compile_template(template):
+    """Return a function that takes a LogRecord and returns '{'-style 'template' filled with its
+    attributes, as str.format() would. Only the fields in 'template' are read.
+    Return None if 'template' uses something other than plain field names (like "{a.b}" or "{a[0]}")
+    with optional conversion and format spec.
+    """
+    pieces = []
+    for literal, field, spec, conversion in string.Formatter().parse(template):
+        pieces.append(literal.replace("{", "{{").replace("}", "}}"))
+        if field is None:
+            continue
+
+        if not field.isidentifier() or keyword.iskeyword(field) or set("{}\\") & set(spec):
+            return None
+
+        pieces.append("{{r.{f}{c}{s}}}".format(
+            f=field,
+            c="!" + conversion if conversion else "",
+            s=":" + spec if spec else "",
+        ))
+
+    return eval("lambda r: f" + repr("".join(pieces)))
+
+
+def make_record(name, levelno, which, created, msg, args=None, msecs=None):
+    """Return a LogRecord like those a Logger() produces, from its essentials: logger 'name',
+    'levelno', logworks level name 'which' ("info", "ok"...), 'created' time and 'msg' (and 'args').
+    The 'msecs' are computed from 'created', unless given. Call site details are left out.
+    The 'clevelname' is uncolored.
+    """
+    if msecs is None:
+        msecs = int((created - int(created)) * 1000)
+
+    return logging.makeLogRecord({
+        "name": name,
+        "levelno": levelno,
+        "levelname": logging.getLevelName(levelno),
+        "msg": msg,
+        "args": args,
+        "created": created,
+        "msecs": msecs + 0.0,
+        "clevelname": "[{w}]".format(w=(which or logging.getLevelName(levelno)).upper()),
+        "lwlevel": which if which in LEVEL_NUMBERS else None,
+    })
+
+
+def _acquire_handler(logger, key, factory):
+    """Return the handler registered for 'key', attached to 'logger'. If there is none,
+    create it by calling 'factory', attach it and register it first.
+    """
+    with _HANDLERS_LOCK:
+        entry = _HANDLERS.get(key)
+        if entry is None:
+            entry = _HANDLERS[key] = [factory(), 0]
+            logger.addHandler(entry[0])
+
+        entry[1] += 1
+
+        return entry[0]
+
+
+def _release_handlers(logger, keys):
+    """Release the handlers registered for 'keys'. Those no Logger() uses anymore are detached
+    from 'logger' and closed.
+    """
+    with _HANDLERS_LOCK:
+        for key in keys:
+            entry = _HANDLERS.get(key)
+            if entry is None:
+                continue
+
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del _HANDLERS[key]
+                logger.removeHandler(entry[0])
+                entry[0].close()
+
+
+def _acquire_file(path, rotation=None, kind=None):
+    """Return the SharedFile for (absolute) 'path', creating it if needed. The 'rotation' policy
+    (see SharedFile) of the first one to ask for it applies. If 'kind' is given, it is the SharedFile
+    subclass to use (e.g. BinaryFile).
+    """
+    kind = kind or SharedFile
+    with _FILES_LOCK:
+        shared = _FILES.get(path)
+        if shared is None:
+            shared = _FILES[path] = kind(path, rotation=rotation)
+        elif type(shared) is not kind:
+            raise ValueError("File '{p}' is already being written as {k}".format(p=path, k=type(shared).__name__))
+
+        shared.users += 1
+
+        return shared
+
+
+def _release_file(shared):
+    """Release SharedFile 'shared', closing it if no one else uses it."""
+
+    with _FILES_LOCK:
+        shared.users -= 1
+        if shared.users <= 0:
+            _FILES.pop(shared.path, None)
+            shared.close()
+
+
+def rolled_segments(path):
+    """Return list of rolled segments of log file 'path' (see SharedFile), oldest first."""
+
+    directory, base = os.path.split(path)
+    pattern = re.compile(re.escape(base) + r"\.(\d{8}-\d{6})(?:\.(\d+))?(?:\.gz|\.xz)?$")
+    found = []
+    for name in os.listdir(directory or "."):
+        match = pattern.match(name)
+        if match:
+            found.append((match.group(1), int(match.group(2) or 0), os.path.join(directory, name)))
+
+    return [segment for _, _, segment in sorted(found)]
+
+
+def _compress_and_prune(path, segment, compress, backup_count):
+    """Compress 'segment' just rolled from log file 'path' with method 'compress' (if any), then remove
+    the oldest segments beyond the newest 'backup_count' (if any). Meant to run in the background.
+    """
+    if compress:
+        module_name, extension = COMPRESSIONS[compress]
+        module = __import__(module_name)  # not imported unless needed, as it is not cheap
+        tmp = segment + extension + ".tmp"
+        with open(segment, "rb") as f_in, module.open(tmp, "wb") as f_out:
+            while True:
+                chunk = f_in.read(1 << 20)
+                if not chunk:
+                    break
+                f_out.write(chunk)
+
+        os.replace(tmp, segment + extension)
+        os.unlink(segment)
+
+    if backup_count:
+        for old in rolled_segments(path)[:-backup_count]:
+            try:
+                os.unlink(old)
+            except OSError:  # maybe someone else removed it already
+                pass
+
+
+def check_confs():
+    """Read again any watched configuration file changed since last read, and apply it to the
+    Logger() instances using it. Unreadable or invalid files (see _check_conf()) are ignored until
+    they change again.
+    """
+    with _WATCHED_LOCK:
+        watched = [(path, list(loggers)) for path, loggers in _WATCHED.items()]
+
+    for path, loggers in watched:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            cached = _CONFS.get(path)
+            if cached is not None and cached[0] == mtime:
+                continue
+
+            with open(path) as f_conf:
+                conf = _check_conf(_frozen(json.load(f_conf)))
+        except (OSError, ValueError):
+            continue
+
+        _CONFS[path] = (mtime, conf)
+        for logger in loggers:
+            try:
+                logger.apply_conf(conf)
+            except Exception:  # the others still get it
+                pass
+
+
+def _check_conf(conf):
+    """Return configuration 'conf' (as read from a file). Raise ValueError if apply_conf() can't use it."""
+
+    if not isinstance(conf, MappingProxyType):
+        raise ValueError("Configuration must be a JSON object")
+
+    if conf.get("level") is not None:
+        level_number(conf["level"])
+
+    return conf
+
+
+def _watch_conf(path, logger):
+    """Have configuration file 'path' checked for changes, to be applied to 'logger'."""
+
+    global _WATCHER
+
+    with _WATCHED_LOCK:
+        _WATCHED.setdefault(os.path.abspath(path), weakref.WeakSet()).add(logger)
+
+        if _WATCHER is None:
+            _WATCHER = threading.Thread(target=_keep_checking_confs, name="logworks-conf-watcher", daemon=True)
+            _WATCHER.start()
+
+
+def _keep_checking_confs():
+    """Main loop of the thread calling check_confs() every RELOAD_INTERVAL seconds."""
+
+    while True:
+        time.sleep(RELOAD_INTERVAL)
+        try:
+            check_confs()
+        except Exception:  # keep watching, whatever happened
+            pass
+
+
+def _frozen(value):
+    """Return read-only version of JSON 'value': dicts as MappingProxyType, and lists as tuples, at any depth."""
+
+    if isinstance(value, dict):
+        return MappingProxyType({k: _frozen(v) for k, v in value.items()})
+
+    if isinstance(value, list):
+        return tuple(_frozen(v) for v in value)
+
+    return value
+
+
+def level_number(level):
+    """Return logging level number for 'level', which can be a number already, or a name
+    ("DEBUG", "info", "ok"...).
+    """
+    if isinstance(level, int):
+        return level
+
+    if not isinstance(level, str):
+        raise ValueError("Unknown logging level {l!r}".format(l=level))
+
+    if level.lower() in LEVEL_NUMBERS:
+        return LEVEL_NUMBERS[level.lower()]
+
+    number = logging.getLevelName(level.upper())
+    if not isinstance(number, int):
+        raise ValueError("Unknown logging level '{l}'".format(l=level))
+
+    return number
+
+
+def level_method(level):
+    """Return name of the Logger() level method ("debug", "ok"...) for 'level', which can be such a
+    name (any case), or a logging level number: that of the highest method at or below it (e.g.
+    "info" for logging.INFO, "error" for logging.CRITICAL).
+    """
+    if isinstance(level, int):
+        below = [which for which, number in LEVEL_NUMBERS.items() if number <= level and which != "ok"]
+        if below:
+            return below[-1]
+    elif isinstance(level, str) and level.lower() in LEVEL_NUMBERS:
+        return level.lower()
+
+    raise ValueError("No level method for level '{l}'. Use one of: {n}, or a level number from "
+                     "logging.DEBUG".format(l=level, n=", ".join(LEVEL_NUMBERS)))
+
+
+def _created_ns(record):
+    """Return creation time of LogRecord 'record', in integer ns since epoch. The milliseconds are
+    those of 'record.msecs' (and the second that of 'record.created'), so that dates read back are
+    formatted the same, and only the sub-millisecond part comes from the float 'record.created'.
+    """
+    seconds = int(record.created)
+    msecs = int(record.msecs)
+    below_msecs = int((record.created - seconds) * 1e9) - msecs * 1000000
+
+    return seconds * 1000000000 + msecs * 1000000 + min(max(below_msecs, 0), 999999)
+
+
+def _binary_level(record):
+    """Return level byte of LogRecord 'record', as written to BinaryFile."""
+
+    if getattr(record, "lwlevel", None) == "ok":
+        return BINARY_OK_LEVEL
+
+    return min(record.levelno, BINARY_OK_LEVEL - 1)
+
+
+def _full_message(record):
+    """Return message of LogRecord 'record', followed by any exception and stack info, as
+    logging.Formatter.format() would append them.
+    """
+    message = record.getMessage()
+    if record.exc_info and not record.exc_text:
+        record.exc_text = _EXC_FORMATTER.formatException(record.exc_info)
+
+    for extra in (record.exc_text, record.stack_info and _EXC_FORMATTER.formatStack(record.stack_info)):
+        if extra:
+            if message[-1:] != "\n":
+                message = message + "\n"
+            message = message + extra
+
+    return message
+
+
+def _noop(*args, **kwargs):
+    """Do nothing. Stands in for the level methods of disabled levels (see Logger.set_level())."""
+
+
+def _lazy(text):
+    """Return 'text' ready to be passed to the logging module, deferring as much work as possible.
+    Any extra 'args' given to the level methods are %-merged into 'text' by logging itself, only
+    if the record is emitted. If 'text' is a zero-arg callable, it will only be called then, too.
+    """
+    if callable(text):
+        return LazyMessage(text)
+
+    return text
+
+
+# Classes:
+class LazyMessage(object):
+    """Message whose text is produced by calling 'func', only when (and if) it is formatted."""
+
+    __slots__ = ("func", "text")
+
+    # Constructor:
+    def __init__(self, func):
+        self.func = func
+        self.text = None
+
+    def __str__(self):
+        if self.text is None:
+            self.text = str(self.func())
+
+        return self.text
+
+
+class SharedFile(object):
+    """A log file, with a single descriptor and write lock for all the handlers writing to it.
+    It is only opened (in append mode) on the first write.
+
+    If given a 'rotation' policy (a dict, as found under "rotation" in the configuration file), the
+    file is renamed to "<path>.<YYYYmmdd-HHMMSS>" and a new one started, before a write would make it
+    exceed "max_bytes", or once "interval" seconds have passed since it was opened. Each rolled segment
+    is then compressed in a background thread if "compress" is "gzip" or "lzma", and only the newest
+    "backup_count" segments are kept, if given.
+    """
+
+    # Constructor:
+    def __init__(self, path, encoding="utf-8", rotation=None):
+        rotation = rotation or {}
+        compress = rotation.get("compress")
+        if compress and compress not in COMPRESSIONS:
+            raise ValueError("Unknown compression '{c}'. Use one of: {m}".format(
+                c=compress, m=", ".join(COMPRESSIONS)))
+
+        self.path = path
+        self.encoding = encoding
+        self.max_bytes = rotation.get("max_bytes")
+        self.interval = rotation.get("interval")
+        self.backup_count = rotation.get("backup_count")
+        self.compress = compress
+        self.rotations = 0
+        self.users = 0
+        self.lock = threading.Lock()
+        self._file = None
+        self._size = 0
+        self._rollover_at = None
+        self._last_roll = (None, 0)  # (time stamp, counter) of last rolled segment
+
+    # Public methods:
+    def write(self, text):
+        """Write 'text' in one go. Return number of bytes written."""
+
+        data = text.encode(self.encoding)
+        with self.lock:
+            if self._file is None:
+                self._open()
+            elif self._due(len(data)):
+                self._rotate()
+
+            self._file.write(data)
+            self._file.flush()
+            self._size += len(data)
+
+        return len(data)
+
+    def close(self):
+        """Close the file, if open. It would be reopened by a later write."""
+
+        with self.lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # Private methods:
+    def _open(self):
+        """Open the file, and take note of its size and when to rotate it by time."""
+
+        self._file = open(self.path, "ab")
+        self._size = self._file.tell()
+        if self.interval:
+            self._rollover_at = time.time() + self.interval
+
+    def _due(self, size):
+        """Return True if the file must be rotated before writing 'size' more bytes to it."""
+
+        if self.max_bytes and self._size and self._size + size > self.max_bytes:
+            return True
+
+        return self._rollover_at is not None and time.time() >= self._rollover_at
+
+    def _rotate(self):
+        """Roll the file, and have the rolled segment compressed and old ones pruned in the background."""
+
+        self._file.close()
+
+        # Rolled within the same second as before? Add a (never reused) counter:
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        n = self._last_roll[1] + 1 if stamp == self._last_roll[0] else 0
+        while True:
+            segment = "{p}.{t}".format(p=self.path, t=stamp)
+            if n:
+                segment = "{s}.{n}".format(s=segment, n=n)
+
+            if not any(os.path.exists(segment + ext) for ext in ("", ".gz", ".xz")):
+                break
+            n += 1
+        self._last_roll = (stamp, n)
+
+        os.rename(self.path, segment)
+        self.rotations += 1
+        self._open()
+
+        if self.compress or self.backup_count:
+            threading.Thread(
+                target=_compress_and_prune,
+                args=(self.path, segment, self.compress, self.backup_count),
+                name="logworks-compressor",
+            ).start()
+
+    # Public properties:
+    @property
+    def is_open(self):
+        """Return True if the file has been opened."""
+
+        return self._file is not None
+
+
+class BinaryFile(SharedFile):
+    """SharedFile holding records in a compact binary format, instead of text: for each record, a fixed
+    header (see BINARY_RECORD) and the message. Logger names are written only once per file, in a string
+    table (see BINARY_STRING), and referred to by id. Read back with the binary module.
+    """
+
+    # Constructor:
+    def __init__(self, path, encoding="utf-8", rotation=None):
+        super().__init__(path, encoding=encoding, rotation=rotation)
+        self._names = {}  # logger name -> string id, in the current file
+
+    # Public methods:
+    def write_records(self, records):
+        """Write LogRecords 'records' in one go. Return number of bytes written."""
+
+        entries = [(_created_ns(r), _binary_level(r), r.name, _full_message(r).encode(self.encoding))
+                   for r in records]
+        size = sum(BINARY_RECORD.size + len(message) for _, _, _, message in entries)
+
+        with self.lock:
+            if self._file is None:
+                self._open()
+            elif self._due(size):
+                self._rotate()
+
+            chunks = []
+            for created, level, name, message in entries:
+                name_id = self._names.get(name)
+                if name_id is None:
+                    name_id = self._names[name] = len(self._names)
+                    encoded = name.encode(self.encoding)
+                    chunks.append(BINARY_STRING.pack(0, name_id, len(encoded)))
+                    chunks.append(encoded)
+                chunks.append(BINARY_RECORD.pack(1, created, level, name_id, len(message)))
+                chunks.append(message)
+
+            data = b"".join(chunks)
+            self._file.write(data)
+            self._file.flush()
+            self._size += len(data)
+
+        return len(data)
+
+    # Private methods:
+    def _open(self):
+        """Open the file, starting its string table. A new file gets the magic bytes first."""
+
+        super()._open()
+        self._names = {}
+        if self._size == 0:
+            self._file.write(BINARY_MAGIC)
+            self._size = len(BINARY_MAGIC)
+
+
+class PooledFileHandler(logging.Handler):
+    """Handler writing to the SharedFile of (absolute) 'path'. Unlike logging.FileHandler,
+    any number of them can write to the same file through a single descriptor.
+    See SharedFile for 'rotation'.
+    """
+
+    terminator = "\n"
+    file_class = SharedFile
+
+    # Constructor:
+    def __init__(self, path, rotation=None):
+        super().__init__()
+        self.path = path
+        self.rotation = rotation
+        self.file = _acquire_file(path, rotation, self.file_class)
+        self.flushes = 0  # number of writes to the file
+        self.bytes_written = 0
+
+    # Public methods:
+    def emit(self, record):
+        """Write 'record' to the file."""
+
+        try:
+            self._write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+    def emit_batch(self, records):
+        """Write all 'records' to the file, with a single write."""
+
+        try:
+            text = "".join(self.format(r) + self.terminator for r in records)
+        except Exception:  # some record can't be formatted: go one by one, to report it
+            for record in records:
+                self.handle(record)
+            return
+
+        with self.lock:
+            try:
+                self._write(text)
+            except Exception:
+                self.handleError(records[0])
+
+    def close(self):
+        """Release the shared file."""
+
+        with self.lock:
+            if self.file is not None:
+                _release_file(self.file)
+                self.file = None
+
+        super().close()
+
+    # Private methods:
+    def _get_file(self):
+        """Return the shared file, acquiring it again if we were closed (as logging.FileHandler
+        reopens its file when used after being closed).
+        """
+        if self.file is None:
+            self.file = _acquire_file(self.path, self.rotation, self.file_class)
+
+        return self.file
+
+    def _write(self, text):
+        """Write 'text' to the file, and update counters."""
+
+        self.bytes_written += self._get_file().write(text)
+        self.flushes += 1
+
+
+class BufferedFileHandler(PooledFileHandler):
+    """PooledFileHandler that keeps records in memory, and writes them out together when they add up
+    to 'buffer_size' characters, 'flush_interval' seconds after the first of them was buffered, or
+    right away when a record of 'flush_level' or above (warnings and errors, by default) comes.
+    """
+
+    # Constructor:
+    def __init__(self, path, buffer_size=65536, flush_interval=1.0, flush_level=logging.WARNING, rotation=None):
+        super().__init__(path, rotation)
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.flush_level = flush_level
+
+        self._buffer = []
+        self._buffered = 0  # characters in buffer
+        self._timer = None
+
+    # Public methods:
+    def emit(self, record):
+        """Buffer 'record', and write out the buffer if due."""
+
+        try:
+            text = self.format(record) + self.terminator
+        except Exception:
+            self.handleError(record)
+            return
+
+        self._buffer.append(text)
+        self._buffered += len(text)
+
+        if record.levelno >= self.flush_level or self._buffered >= self.buffer_size:
+            try:
+                self._write_buffer()
+            except Exception:
+                self.handleError(record)
+        elif self._timer is None:
+            self._timer = threading.Timer(self.flush_interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def emit_batch(self, records):
+        """Buffer all 'records', and write out the buffer if due."""
+
+        with self.lock:
+            for record in records:
+                BufferedFileHandler.emit(self, record)  # not self.emit, which instrument() may wrap
+
+    def flush(self):
+        """Write out whatever is buffered."""
+
+        with self.lock:
+            try:
+                self._write_buffer()
+            except Exception:
+                if logging.raiseExceptions:
+                    sys.stderr.write("--- Logging error: could not write buffer to {p} ---\n".format(p=self.path))
+
+    def close(self):
+        """Write out whatever is buffered, and release the shared file."""
+
+        self.flush()
+        super().close()
+
+    # Private methods:
+    def _write_buffer(self):
+        """Write the buffer out (if not empty) and empty it."""
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if self._buffer:
+            text = "".join(self._buffer)
+            self._buffer = []
+            self._buffered = 0
+            self._write(text)
+
+
+class BinaryFileHandler(PooledFileHandler):
+    """PooledFileHandler writing records to a BinaryFile, unformatted: its formatter is not used.
+    Text is only produced when the file is read back (see the binary module).
+    """
+
+    file_class = BinaryFile
+
+    # Public methods:
+    def emit(self, record):
+        """Write 'record' to the file."""
+
+        try:
+            self._write_records([record])
+        except Exception:
+            self.handleError(record)
+
+    def emit_batch(self, records):
+        """Write all 'records' to the file, with a single write."""
+
+        with self.lock:
+            try:
+                self._write_records(records)
+            except Exception:
+                self.handleError(records[0])
+
+    # Private methods:
+    def _write_records(self, records):
+        """Write 'records' to the file, and update counters."""
+
+        self.bytes_written += self._get_file().write_records(records)
+        self.flushes += 1
+
+
+class ConsoleHandler(logging.StreamHandler):
+    """logging.StreamHandler (to stderr by default) counting bytes written (as encoded by the
+    stream, or in UTF-8 if it doesn't tell), and able to write many records at once.
+    """
+
+    # Constructor:
+    def __init__(self, stream=None):
+        super().__init__(stream)
+        self.bytes_written = 0
+
+    # Public methods:
+    def emit(self, record):
+        """Write 'record' to the stream."""
+
+        try:
+            text = self.format(record) + self.terminator
+            self.stream.write(text)
+            self.flush()
+            self.bytes_written += self._size(text)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def emit_batch(self, records):
+        """Write all 'records' to the stream, with a single write."""
+
+        try:
+            text = "".join(self.format(r) + self.terminator for r in records)
+        except Exception:  # some record can't be formatted: go one by one, to report it
+            for record in records:
+                self.handle(record)
+            return
+
+        with self.lock:
+            try:
+                self.stream.write(text)
+                self.flush()
+                self.bytes_written += self._size(text)
+            except Exception:
+                self.handleError(records[0])
+
+    # Private methods:
+    def _size(self, text):
+        """Return size of 'text' in bytes, once encoded for our stream."""
+
+        if text.isascii():
+            return len(text)
+
+        return len(text.encode(getattr(self.stream, "encoding", None) or "utf-8", "replace"))
+
+
+class Counters(object):
+    """Named counters, cheap to update from many threads at once: each thread updates its own
+    (so no lock is needed), and they are only combined when read.
+    """
+
+    # Constructor:
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()  # only taken when a thread first updates, and to read
+        self._sums = []  # one dict per thread
+        self._maxima = []  # one dict per thread
+
+    # Public methods:
+    def add(self, key, value=1):
+        """Add 'value' to counter 'key'."""
+
+        try:
+            sums = self._local.sums
+        except AttributeError:
+            sums = self._new_thread()[0]
+
+        sums[key] = sums.get(key, 0) + value
+
+    def add_max(self, key, value):
+        """Add 'value' to counter 'key', and keep track of its maximum value as 'key' + "_max"."""
+
+        try:
+            sums, maxima = self._local.sums, self._local.maxima
+        except AttributeError:
+            sums, maxima = self._new_thread()
+
+        sums[key] = sums.get(key, 0) + value
+        if value > maxima.get(key, 0):
+            maxima[key] = value
+
+    def snapshot(self):
+        """Return dict with current value of all counters."""
+
+        with self._lock:
+            sums = [d.copy() for d in self._sums]
+            maxima = [d.copy() for d in self._maxima]
+
+        total = {}
+        for d in sums:
+            for key, value in d.items():
+                total[key] = total.get(key, 0) + value
+
+        for d in maxima:
+            for key, value in d.items():
+                total[key + "_max"] = max(total.get(key + "_max", 0), value)
+
+        return total
+
+    # Private methods:
+    def _new_thread(self):
+        """Create (and return) the dicts of sums and maxima of current thread."""
+
+        self._local.sums = sums = {}
+        self._local.maxima = maxima = {}
+        with self._lock:
+            self._sums.append(sums)
+            self._maxima.append(maxima)
+
+        return sums, maxima
+
+
+class StatsHandler(logging.Handler):
+    """Handler only counting the records it gets, by logworks level ("info", "ok"...). It takes no lock."""
+
+    # Constructor:
+    def __init__(self):
+        super().__init__()
+        self.counters = Counters()
+
+    # Public methods:
+    def handle(self, record):
+        """Count 'record' (no filters, no lock)."""
+
+        self.counters.add(getattr(record, "lwlevel", None) or record.levelname.lower())
+
+        return True
+
+    def emit(self, record):
+        self.handle(record)
+
+    def counts(self):
+        """Return dict with number of records of each level."""
+
+        counts = {which: 0 for which in LEVEL_NUMBERS}
+        counts.update(self.counters.snapshot())
+
+        return counts
+
+
+def instrument(handler):
+    """Make 'handler' keep track (in handler.lwstats Counters) of the records it emits, and the time
+    spent (in ns) emitting them. Return those Counters. Doing it again is harmless.
+    """
+    stats = getattr(handler, "lwstats", None)
+    if stats is not None:
+        return stats
+
+    stats = handler.lwstats = Counters()
+    clock = time.perf_counter_ns
+    emit = handler.emit
+    emit_batch = getattr(handler, "emit_batch", None)
+
+    def timed_emit(record):
+        start = clock()
+        try:
+            emit(record)
+        finally:
+            stats.add("records")
+            stats.add_max("emit_ns", clock() - start)
+
+    def timed_emit_batch(records):
+        start = clock()
+        try:
+            emit_batch(records)
+        finally:
+            stats.add("records", len(records))
+            stats.add_max("emit_ns", clock() - start)
+
+    handler.emit = timed_emit
+    if emit_batch is not None:
+        handler.emit_batch = timed_emit_batch
+
+    return stats
+
+
+def handler_stats(handler):
+    """Return dict with stats of instrument()-ed 'handler'."""
+
+    stats = {
+        "handler": type(handler).__name__,
+        "records": 0,
+        "emit_ns": 0,
+        "emit_ns_max": 0,
+    }
+    stats.update(handler.lwstats.snapshot())
+
+    for attr, key in (("path", "target"), ("bytes_written", "bytes"), ("flushes", "flushes"), ("dropped", "dropped")):
+        if hasattr(handler, attr):
+            stats[key] = getattr(handler, attr)
+
+    return stats
+
+
+class CapturedRecord(object):
+    """Compact copy of a LogRecord, as kept by RingHandler. The message is only formatted when read."""
+
+    __slots__ = ("name", "levelno", "level", "created", "msg", "args")
+
+    # Constructor:
+    def __init__(self):
+        self.name = None
+        self.levelno = 0
+        self.level = None  # logworks level name ("info", "ok"...), or stdlib one (lowercase)
+        self.created = 0.0
+        self.msg = None
+        self.args = None
+
+    # Public methods:
+    def fill(self, record):
+        """Copy from LogRecord 'record'."""
+
+        self.name = record.name
+        self.levelno = record.levelno
+        self.level = getattr(record, "lwlevel", None) or record.levelname.lower()
+        self.created = record.created
+        self.msg = record.msg
+        self.args = record.args
+
+    def copy(self):
+        """Return a copy of self."""
+
+        other = CapturedRecord()
+        for attr in CapturedRecord.__slots__:
+            setattr(other, attr, getattr(self, attr))
+
+        return other
+
+    def to_log_record(self):
+        """Return a LogRecord equivalent to the original one (except for call site details)."""
+
+        return make_record(self.name, self.levelno, self.level, self.created, self.msg, self.args)
+
+    # Public properties:
+    @property
+    def message(self):
+        """Return formatted message."""
+
+        msg = str(self.msg)
+        if self.args:
+            msg = msg % self.args
+
+        return msg
+
+
+class RingHandler(logging.Handler):
+    """Handler keeping the latest 'capacity' records in memory, in a preallocated ring buffer of
+    CapturedRecord objects. If 'dump_to' is given, the records kept since the previous dump are
+    appended to that file (formatted with our formatter) whenever a record of 'dump_level' or above
+    comes, so that it can serve as a flight recorder.
+    """
+
+    # Constructor:
+    def __init__(self, capacity=1000, dump_to=None, dump_level=logging.ERROR):
+        super().__init__()
+        self.capacity = capacity
+        self.dump_to = dump_to
+        self.dump_level = dump_level
+        self.setFormatter(DEFAULT_FILE_FORMATTER)
+
+        self._ring = [CapturedRecord() for _ in range(capacity)]
+        self._next = 0  # where next record goes
+        self._count = 0  # records in ring
+        self._undumped = 0  # latest records in ring not dumped to 'dump_to' yet
+
+    # Public methods:
+    def emit(self, record):
+        """Keep 'record', overwriting the oldest one if full. Dump if due."""
+
+        self._ring[self._next].fill(record)
+        self._next = (self._next + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+        if self._undumped < self.capacity:
+            self._undumped += 1
+
+        if self.dump_to and record.levelno >= self.dump_level:
+            undumped, self._undumped = self._undumped, 0
+            try:
+                self._write(self.dump_to, self._kept(undumped))
+            except Exception:
+                self.handleError(record)
+
+    def records(self, level=None, contains=None):
+        """Return list of kept records, oldest first. If 'level' is a string ("ok", "warning"...),
+        return only those of that level. If it is a number (logging.WARNING...), those of that level
+        or above. If 'contains' is given, only those whose message contains it.
+        """
+        with self.lock:
+            kept = self._kept(self._count)
+
+        if isinstance(level, str):
+            kept = [r for r in kept if r.level == level]
+        elif level is not None:
+            kept = [r for r in kept if r.levelno >= level]
+
+        if contains is not None:
+            kept = [r for r in kept if contains in r.message]
+
+        return kept
+
+    def clear(self):
+        """Forget all kept records."""
+
+        with self.lock:
+            self._next = 0
+            self._count = 0
+            self._undumped = 0
+
+    def dump(self, path):
+        """Append all kept records to file 'path', formatted."""
+
+        self._write(path, self.records())
+
+    # Private methods:
+    def _kept(self, count):
+        """Return copies of the latest 'count' kept records, oldest first. Call with lock held."""
+
+        start = (self._next - count) % self.capacity
+        return [self._ring[(start + i) % self.capacity].copy() for i in range(count)]
+
+    def _write(self, path, records):
+        """Append 'records' to file 'path', formatted."""
+
+        lines = [self.format(r.to_log_record()) + "\n" for r in records]
+        with open(path, "a") as f:
+            f.write("".join(lines))
+
+
+class BackgroundHandler(logging.Handler):
+    """Handler that only queues records. A single background thread takes them out of the queue
+    in batches, and has them formatted and written by 'handlers'.
+
+    When the queue is full (it holds at most 'queue_size' records), 'overflow' decides:
+        "block": wait until the writer makes room.
+        "drop_oldest": discard the oldest queued record.
+        "drop_debug": discard a queued DEBUG record (or the new one, if DEBUG). Block otherwise.
+    Discarded records are counted in 'dropped'.
+
+    The logging module flushes and closes all handlers at interpreter exit, this one included.
+    """
+
+    # Constructor:
+    def __init__(self, handlers, queue_size=10000, overflow="block"):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError("Unknown overflow policy '{o}'. Use one of: {p}".format(
+                o=overflow, p=", ".join(OVERFLOW_POLICIES)))
+
+        super().__init__()
+        self.handlers = list(handlers)
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.dropped = 0
+
+        self._queue = collections.deque()
+        self._cond = threading.Condition()
+        self._busy = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="logworks-writer", daemon=True)
+        self._thread.start()
+
+    # Public methods:
+    def handle(self, record):
+        """Like logging.Handler.handle(), but without the handler lock: emit() is synchronized."""
+
+        rv = self.filter(record)
+        if rv:
+            self.emit(record)
+
+        return rv
+
+    def emit(self, record):
+        """Queue 'record', applying the overflow policy if the queue is full."""
+
+        with self._cond:
+            if self._closed:
+                self.dropped += 1
+                return
+
+            while len(self._queue) >= self.queue_size:
+                if self.overflow == "drop_oldest":
+                    self._queue.popleft()
+                    self.dropped += 1
+                elif self.overflow == "drop_debug" and self._drop_debug():
+                    pass
+                elif self.overflow == "drop_debug" and record.levelno <= logging.DEBUG:
+                    self.dropped += 1
+                    return
+                else:
+                    self._cond.wait()
+
+            self._queue.append(record)
+            self._cond.notify_all()
+
+    def flush(self):
+        """Wait until all queued records have been written, then flush the handlers."""
+
+        if threading.current_thread() is not self._thread:
+            with self._cond:
+                while (self._queue or self._busy) and self._thread.is_alive():
+                    self._cond.wait()
+
+        for handler in self.handlers:
+            handler.flush()
+
+    def close(self):
+        """Write whatever is queued, stop the background thread and close the handlers."""
+
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+        if threading.current_thread() is not self._thread:
+            self._thread.join()
+
+        for handler in self.handlers:
+            handler.close()
+
+        super().close()
+
+    # Private methods:
+    def _drop_debug(self):
+        """Remove the oldest queued DEBUG record, if any. Return True if one was removed."""
+
+        for i, queued in enumerate(self._queue):
+            if queued.levelno <= logging.DEBUG:
+                del self._queue[i]
+                self.dropped += 1
+                return True
+
+        return False
+
+    def _run(self):
+        """Main loop of the background thread."""
+
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+
+                if not self._queue:  # closed, and nothing left to write
+                    return
+
+                batch = list(self._queue)
+                self._queue.clear()
+                self._busy = True
+                self._cond.notify_all()
+
+            for handler in self.handlers:
+                records = [r for r in batch if r.levelno >= handler.level and handler.filter(r)]
+                if records:
+                    BackgroundHandler._write_batch(handler, records)
+
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    # Static methods:
+    @staticmethod
+    def _write_batch(handler, records):
+        """Write all 'records' through 'handler', with a single write when possible."""
+
+        if hasattr(handler, "emit_batch"):
+            handler.emit_batch(records)
+            return
+
+        if isinstance(handler, logging.StreamHandler) and handler.stream is not None:
+            try:
+                text = "".join(handler.format(r) + handler.terminator for r in records)
+            except Exception:
+                pass  # some record can't be formatted: fall back to one by one, to report it
+            else:
+                with handler.lock:
+                    try:
+                        handler.stream.write(text)
+                        handler.flush()
+                    except Exception:
+                        handler.handleError(records[0])
+                return
+
+        for record in records:
+            handler.handle(record)
+
+
+class TimingStats(object):
+    """Count, total, min and max of the times taken by a block timed with Logger.timed(..., every=N),
+    since its last summary. The summary is due every 'every' seconds.
+    """
+
+    # Constructor:
+    def __init__(self, every):
+        self.every_ns = int(every * 1e9)
+        self.lock = threading.Lock()
+        self._reset(time.perf_counter_ns())
+
+    # Public methods:
+    def add(self, elapsed, now):
+        """Add 'elapsed' (ns) ending at 'now' (perf_counter_ns()). Return the summary if due, else None."""
+
+        with self.lock:
+            self.count += 1
+            self.total += elapsed
+            if elapsed < self.min:
+                self.min = elapsed
+            if elapsed > self.max:
+                self.max = elapsed
+
+            if now - self.since < self.every_ns:
+                return None
+
+            return self._take(now)
+
+    def take(self):
+        """Return the summary of the times added so far (None if none), and start over."""
+
+        with self.lock:
+            return self._take(time.perf_counter_ns()) if self.count else None
+
+    # Private methods:
+    def _take(self, now):
+        summary = (self.count, self.min, self.total / self.count, self.max, (now - self.since) / 1e9)
+        self._reset(now)
+
+        return summary
+
+    def _reset(self, now):
+        self.count = 0
+        self.total = 0
+        self.min = float("inf")
+        self.max = 0
+        self.since = now
+
+
+class Timed(contextlib.ContextDecorator):
+    """Context manager (or decorator) logging the time taken by a block (or call) to 'logger'.
+    Returned by Logger.timed(), see there.
+    """
+
+    # Constructor:
+    def __init__(self, logger, label, level="ok", timing=None):
+        self.logger = logger
+        self.label = label
+        self.level = level
+        self.timing = timing
+        self.start = None
+
+    # Public methods:
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        now = time.perf_counter_ns()
+        elapsed = now - self.start
+
+        if exc_type is not None:
+            self.logger.error("%s failed after %.3f ms: %r", self.label, elapsed / 1e6, exc_value)
+        elif self.timing is None:
+            getattr(self.logger, self.level)("%s took %.3f ms", self.label, elapsed / 1e6)
+        else:
+            summary = self.timing.add(elapsed, now)
+            if summary is not None:
+                self.log_summary(summary)
+
+        return False
+
+    def log_summary(self, summary):
+        """Log 'summary', as returned by TimingStats.add() or take()."""
+
+        count, low, mean, high, seconds = summary
+        getattr(self.logger, self.level)("%s: %d calls in %.1f s, min/mean/max %.3f/%.3f/%.3f ms",
+                                         self.label, count, seconds, low / 1e6, mean / 1e6, high / 1e6)
+
+    # Private methods:
+    def _recreate_cm(self):
+        # Each decorated call gets its own start time (calls may overlap, in threads or recursion):
+        return Timed(self.logger, self.label, self.level, self.timing)
+
+
+class RateLimiter(object):
+    """Token bucket per key (a call site and message template, see Logger(rate_limit=...)): each key
+    allows 'burst' records at once, and 'rate' more per second after that. The rest are suppressed, and
+    counted. Only the 'max_keys' most recently used keys are kept (in an LRU), so that memory stays bounded.
+    Every 'interval' seconds, 'due' becomes True, to report the suppressed counts (see take_summary()).
+    """
+
+    # Constructor:
+    def __init__(self, rate=1.0, burst=10, max_keys=1000, interval=60.0):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.interval = interval
+        self.due = False
+        self.lock = threading.Lock()
+        self._buckets = collections.OrderedDict()  # key -> [tokens, last refill time, suppressed]
+        self._evicted = 0  # suppressed by keys no longer kept
+        self._summary_at = time.monotonic() + interval
+
+    # Public methods:
+    def allow(self, key):
+        """Return True if a record for 'key' may go through, taking a token for it."""
+
+        now = time.monotonic()
+        with self.lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [self.burst, now, 0]
+                if len(self._buckets) > self.max_keys:
+                    self._evicted += self._buckets.popitem(last=False)[1][2]
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+
+            if now >= self._summary_at:
+                self.due = True
+
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return True
+
+            bucket[2] += 1
+
+            return False
+
+    def take_summary(self):
+        """Return list of (key, suppressed count) of the keys with records suppressed since the last
+        summary (with a None key for those no longer kept), and start counting again.
+        """
+        with self.lock:
+            summary = [(key, bucket[2]) for key, bucket in self._buckets.items() if bucket[2]]
+            for bucket in self._buckets.values():
+                bucket[2] = 0
+
+            if self._evicted:
+                summary.append((None, self._evicted))
+                self._evicted = 0
+
+            self.due = False
+            self._summary_at = time.monotonic() + self.interval
+
+        return summary
+
+
+class Formatter(logging.Formatter):
+    """A '{'-style logging.Formatter, which formats the date only once per second."""
+
+    # Constructor:
+    def __init__(self, fmt=None, datefmt=None):
+        super().__init__(fmt=fmt, datefmt=datefmt, style="{")
+        self._time_cache = (None, None, None)  # (second, datefmt, formatted date)
+
+    # Public methods:
+    def formatTime(self, record, datefmt=None):
+        """Return creation time of 'record', formatted as per 'datefmt', as logging.Formatter would.
+        The formatted date is reused until the second changes. Without 'datefmt', the milliseconds
+        are appended to it afterwards (as per 'default_msec_format').
+        """
+        second = int(record.created)
+        cached_second, cached_datefmt, formatted = self._time_cache
+        if second != cached_second or datefmt != cached_datefmt:
+            formatted = time.strftime(datefmt or self.default_time_format, self.converter(record.created))
+            self._time_cache = (second, datefmt, formatted)
+
+        if datefmt or not self.default_msec_format:
+            return formatted
+
+        return self.default_msec_format % (formatted, record.msecs)
+
+
+DEFAULT_CONSOLE_FORMATTER = Formatter(
+    fmt=DEFAULT_CONSOLE_FORMAT,
+    datefmt=DEFAULT_DATE_FORMAT,
 )
-DEFAULT_FILE_FORMATTER = logging.Formatter(
-    fmt='{asctime} [{levelname}] {message}',
-    datefmt="%Y-%m-%d %H:%M:%S",
-    style="{"
+DEFAULT_FILE_FORMATTER = Formatter(
+    fmt=DEFAULT_FILE_FORMAT,
+    datefmt=DEFAULT_DATE_FORMAT,
 )
-DEFAULT_CONF = {
-    "colorize": True,
-    "logfile": "logworks.log",
-    "colors": {
-        "debug": 37,
-        "info": 34,
-        "warning": 33,
-        "error": 31,
-        "name": 36,
-        "ok": 32,
-    }
-}
 
 
-# Functions:
-def get_formatter(format='{asctime} {clevelname} {message}', date_format="%Y-%m-%d %H:%M:%S"):
-    """Helper to produce a custom logging format."""
+class CompiledFormatter(Formatter):
+    """A Formatter producing the very same output, but faster: the template is compiled once
+    (see compile_template()) into a function reading only the fields it needs.
+    """
 
-    return logging.Formatter(
-        fmt=format,
-        datefmt=date_format,
-        style="{"
-    )
+    # Constructor:
+    def __init__(self, fmt, datefmt=None):
+        super().__init__(fmt=fmt, datefmt=datefmt)
+        self._render = compile_template(fmt)
+
+    def __reduce__(self):
+        """Pickle as the arguments to build it again (the compiled template is not picklable)."""
+
+        return type(self), (self._fmt, self.datefmt)
+
+    # Public methods:
+    def formatMessage(self, record):
+        """Return template filled with attributes of 'record'."""
+
+        if self._render is None:
+            return super().formatMessage(record)
+
+        try:
+            return self._render(record)
+        except AttributeError as e:
+            raise ValueError("Formatting field not found in record: {e}".format(e=e))
+
+
+class JsonFormatter(logging.Formatter):
+    """Formatter producing one JSON object per record, in a single line: "time" (see get_json_formatter()
+    for 'time_format'), "level" (logworks level name: "info", "ok"...), logger "name", "message",
+    any fields bound with Logger.bind(), and "exc_info" and "stack_info", if any. Keys are encoded
+    once, and string values escaped by the json C accelerator. Colors never show up in the output.
+    """
+
+    # Constructor:
+    def __init__(self, time_format="iso"):
+        if time_format not in JSON_TIME_FORMATS:
+            raise ValueError("Unknown time format '{t}'. Use one of: {f}".format(
+                t=time_format, f=", ".join(JSON_TIME_FORMATS)))
+
+        super().__init__()
+        self.time_format = time_format
+        self._time_cache = (None, None, None)  # (second, date and time, UTC offset)
+        self._keys = {}  # field name -> ',"name":'
+
+    # Public methods:
+    def format(self, record):
+        """Return 'record' as a JSON object."""
+
+        if self.time_format == "iso":
+            created = '{"time":"' + self.formatTime(record) + '"'
+        else:
+            created = '{"time":' + repr(record.created)
+
+        parts = [
+            created,
+            ',"level":', _JSON_ENCODE(getattr(record, "lwlevel", None) or record.levelname.lower()),
+            ',"name":', _JSON_ENCODE(record.name),
+            ',"message":', _JSON_ENCODE(record.getMessage()),
+        ]
+
+        for field in getattr(record, "lwbound", ()):
+            parts.append(self._key(field))
+            parts.append(self._value(getattr(record, field)))
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            parts.append(',"exc_info":')
+            parts.append(_JSON_ENCODE(record.exc_text))
+        if record.stack_info:
+            parts.append(',"stack_info":')
+            parts.append(_JSON_ENCODE(self.formatStack(record.stack_info)))
+
+        parts.append("}")
+
+        return "".join(parts)
+
+    def formatTime(self, record, datefmt=None):
+        """Return creation time of 'record' as ISO 8601 local time, with milliseconds and UTC offset
+        (e.g. "2026-10-17T14:00:00.123+02:00"). All but the milliseconds is reused until the second changes.
+        """
+        second = int(record.created)
+        cached_second, formatted, offset = self._time_cache
+        if second != cached_second:
+            local = self.converter(record.created)
+            formatted = time.strftime("%Y-%m-%dT%H:%M:%S", local)
+            offset = time.strftime("%z", local)
+            offset = offset[:3] + ":" + offset[3:]
+            self._time_cache = (second, formatted, offset)
+
+        return "{t}.{m:03d}{o}".format(t=formatted, m=int(record.msecs), o=offset)
+
+    # Private methods:
+    def _key(self, field):
+        """Return encoded key for 'field', preceded by a comma."""
+
+        key = self._keys.get(field)
+        if key is None:
+            key = self._keys[field] = "," + _JSON_ENCODE(field) + ":"
+
+        return key
+
+    @staticmethod
+    def _value(value):
+        """Return 'value' encoded as JSON. Strings go the fast way; anything not JSON serializable as str()."""
+
+        if type(value) is str:
+            return _JSON_ENCODE(value)
+
+        return json.dumps(value, ensure_ascii=False, default=str)
 
 
-# Classes:
 class Logger(object):
     """Class to hold logging stuff."""
-    
+
+    # Level used if not given, and not found as "level" in the configuration file:
+    default_level = logging.INFO
+
     # Constructor:
     def __init__(self, conf_fn=None, use_color=True, console_formatter=DEFAULT_CONSOLE_FORMATTER,
-                 file_formatter=DEFAULT_FILE_FORMATTER, which_logger=__name__, level=logging.INFO,
-                 console_output=True, file_output=True, logfile=None):
-        # If given a configuration file name, try to read it:
+                 file_formatter=DEFAULT_FILE_FORMATTER, which_logger=__name__, level=None,
+                 console_output=True, file_output=True, logfile=None, async_io=False, queue_size=10000,
+                 overflow="block", buffered=False, buffer_size=65536, flush_interval=1.0, capture=0,
+                 dump_to=None, rotation=None, stats=False, hot_reload=False, binary=False, rate_limit=None):
+        # Avoid colors?:
+        self._no_color = not use_color
+
+        # If given a configuration file name, try to read it (this also builds the level tags):
         if conf_fn:
             self.conf = Logger.read_conf(conf_fn)
         else:
             self.conf = DEFAULT_CONF
 
-        # Avoid colors?:
-        self.no_color = not use_color
+        # Level, if not given:
+        if level is None:
+            level = self.conf.get("level")
+        level = self.default_level if level is None else level_number(level)
+
+        # Rate limiting of the level methods, per call site and message (see RateLimiter for the
+        # keys of 'rate_limit'; True, or {}, means all defaults; False, none):
+        if rate_limit is None:
+            rate_limit = self.conf.get("rate_limit", None)
+        if rate_limit is True:
+            rate_limit = {}
+        self.limiter = RateLimiter(**rate_limit) if rate_limit is not None and rate_limit is not False else None
 
         # Logger object:
         self.logger = logging.getLogger(which_logger)
-        self.logger.setLevel(level)
+        with _INSTANCES_LOCK:
+            _INSTANCES.setdefault(which_logger, weakref.WeakSet()).add(self)
+
+        # Output handlers. Each one is shared with any other Logger() with the same logger name,
+        # output target and formatter, so that no record is ever written twice:
+        targets = {}  # role -> (key, factory)
 
         # Console output handler:
         if console_output:
-            ch = logging.StreamHandler()
-            ch.setFormatter(console_formatter)
-            ch.setLevel(level)
-            self.logger.addHandler(ch)
+            targets["console"] = (
+                (which_logger, sys.stderr, console_formatter),
+                lambda: Logger._new_handler(ConsoleHandler(), console_formatter, level),
+            )
 
         # File output handler:
         if file_output:
             if not logfile:
                 logfile = self.conf.get("logfile", None)
 
+            if rotation is None:
+                rotation = self.conf.get("rotation", None)
+
             if logfile:
-                fh = logging.FileHandler(logfile)
-                fh.setFormatter(file_formatter)
-                self.logger.addHandler(fh)
+                path = os.path.abspath(logfile)
+                if binary:  # unformatted, so never buffered
+                    targets["file"] = (
+                        (which_logger, path, "binary"),
+                        lambda: Logger._new_handler(BinaryFileHandler(path, rotation), file_formatter),
+                    )
+                elif buffered:
+                    targets["file"] = (
+                        (which_logger, path, file_formatter, buffer_size, flush_interval),
+                        lambda: Logger._new_handler(
+                            BufferedFileHandler(path, buffer_size, flush_interval, rotation=rotation),
+                            file_formatter),
+                    )
+                else:
+                    targets["file"] = (
+                        (which_logger, path, file_formatter),
+                        lambda: Logger._new_handler(PooledFileHandler(path, rotation), file_formatter),
+                    )
+
+        # In-memory capture handler:
+        if capture:
+            dump_path = os.path.abspath(dump_to) if dump_to else None
+            targets["capture"] = (
+                (which_logger, "capture", capture, dump_path),
+                lambda: Logger._new_handler(RingHandler(capture, dump_path), file_formatter),
+            )
+
+        # Per-level counts:
+        if stats:
+            targets["stats"] = ((which_logger, "stats"), StatsHandler)
+
+        # Handlers actually attached to the logging.Logger (the targets themselves, or a single
+        # BackgroundHandler writing to them):
+        if async_io:
+            key = (which_logger, "async", queue_size, overflow) + tuple(k for k, _ in targets.values())
+            factories = [f for _, f in targets.values()]
+            attach = [(key, lambda: BackgroundHandler([f() for f in factories], queue_size, overflow))]
+        else:
+            attach = list(targets.values())
+
+        self._attached = [_acquire_handler(self.logger, key, factory) for key, factory in attach]
+        self._finalizer = weakref.finalize(self, _release_handlers, self.logger, [k for k, _ in attach])
+
+        if async_io:
+            self.writer = self._attached[0]
+            self.handlers = list(self.writer.handlers)
+        else:
+            self.writer = None
+            self.handlers = list(self._attached)
+
+        roles = dict(zip(targets, self.handlers))
+        self.console_handler = roles.get("console")
+        self.file_handler = roles.get("file")
+        self.capture_handler = roles.get("capture")
+        self.stats_handler = roles.pop("stats", None)
+
+        # Timing of the output handlers:
+        if stats:
+            for handler in [self.writer] + list(roles.values()):
+                if handler is not None:
+                    instrument(handler)
+
+        # Timed() of Logger.timed(..., every=N) blocks, with their aggregated times, by (label, level):
+        self._timings = {}
+
+        # A reused console handler follows the level of the latest Logger(), as the logging.Logger does:
+        self.set_level(level)
+
+        # Only once fully built, as the watcher thread may apply a new configuration right away:
+        if conf_fn and hot_reload:
+            _watch_conf(conf_fn, self)
 
     # Public methods:
-    def debug(self, text):
-        """Log (print) 'text' as debug."""
+    def debug(self, text, *args):
+        """Log (print) 'text' as debug. See _lazy() for 'args' and callable 'text'."""
 
-        extra = {
-            "clevelname": self.with_debug_color("[DEBUG]"),
-        }
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(_lazy(text), *args, extra=self._extras["debug"])
 
-        self.logger.debug(text, extra=extra)
+    def info(self, text, *args):
+        """Log (print) 'text' as info. See _lazy() for 'args' and callable 'text'."""
 
-    def info(self, text):
-        """Log (print) 'text' as info."""
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(_lazy(text), *args, extra=self._extras["info"])
 
-        extra = {
-            "clevelname": self.with_info_color("[INFO]"),
-        }
+    def ok(self, text, *args):
+        """Log (print) 'text' as OK. See _lazy() for 'args' and callable 'text'."""
 
-        self.logger.info(text, extra=extra)
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(_lazy(text), *args, extra=self._extras["ok"])
 
-    def ok(self, text):
-        """Log (print) 'text' as OK."""
+    def warning(self, text, *args):
+        """Log (print) 'text' as warning. See _lazy() for 'args' and callable 'text'."""
 
-        extra = {
-            "clevelname": self.with_ok_color("[OK]"),
-        }
+        if self.logger.isEnabledFor(logging.WARNING):
+            self.logger.warning(_lazy(text), *args, extra=self._extras["warning"])
 
-        self.logger.info(text, extra=extra)
+    def error(self, text, *args):
+        """Log (print) 'text' as error. See _lazy() for 'args' and callable 'text'."""
 
-    def warning(self, text):
-        """Log (print) 'text' as warning."""
+        if self.logger.isEnabledFor(logging.ERROR):
+            self.logger.error(_lazy(text), *args, extra=self._extras["error"])
 
-        extra = {
-            "clevelname": self.with_warning_color("[WARNING]"),
-        }
+    def set_level(self, level):
+        """Set logging 'level' (of logging.Logger and console output). The level methods below it
+        (in this and any other Logger() sharing the logging.Logger) become a no-op, so that calling
+        them costs next to nothing. Setting the level of the logging.Logger directly bypasses this.
+        """
+        self.logger.setLevel(level)
+        if self.console_handler is not None:
+            self.console_handler.setLevel(level)
+
+        with _INSTANCES_LOCK:
+            instances = list(_INSTANCES.get(self.logger.name, ()))
+
+        for instance in instances:
+            instance._bind_levels()
 
-        self.logger.warning(text, extra=extra)
+    def bind(self, **fields):
+        """Return a BoundLogger child of this Logger, adding 'fields' to every record it logs (as
+        attributes, so that templates can use them, like "{request_id}").
+        """
+        return BoundLogger(self, fields)
+
+    def apply_conf(self, conf):
+        """Use configuration 'conf' from now on: colors, and "level" if given in it.
+        Handlers are left untouched (so, e.g., a change of "logfile" is ignored).
+        Called with the new configuration whenever the file changes, if 'hot_reload'.
+        """
+        self.conf = conf
+
+        level = conf.get("level")
+        if level is not None:
+            self.set_level(level_number(level))
+
+    def captured(self, level=None, contains=None):
+        """Return list of captured records (see RingHandler.records()). Empty if not capturing."""
+
+        if self.capture_handler is None:
+            return []
+
+        return self.capture_handler.records(level=level, contains=contains)
+
+    def stats(self):
+        """Return a snapshot of the stats of this Logger, if created with 'stats', or None.
+        That is, a dict with the number of records of each level ("counts"), the records dropped for
+        lack of room in the queue, if async_io ("dropped"), and for each output handler ("handlers"):
+        records written, time spent writing them (total and max, in ns) and bytes written.
+        """
+        if self.stats_handler is None:
+            return None
 
-    def error(self, text):
-        """Log (print) 'text' as error."""
+        handlers = [self.writer] + [h for h in self.handlers if h is not self.stats_handler]
 
-        extra = {
-            "clevelname": self.with_error_color("[ERROR]"),
+        return {
+            "counts": self.stats_handler.counts(),
+            "dropped": self.writer.dropped if self.writer else 0,
+            "handlers": [handler_stats(h) for h in handlers if h is not None],
         }
 
-        self.logger.error(text, extra=extra)
+    def timed(self, label, level="ok", every=None):
+        """Return context manager (also usable as decorator) logging the time taken by the block
+        (or each call), as "'label' took N ms", through the 'level' method (see level_method() for
+        the levels accepted). If the block raises, its time and exception are logged as error instead
+        (and the exception is not swallowed).
+        With 'every' (seconds), successful times are not logged one by one, but aggregated per
+        'label' and level: a single summary line (count, min/mean/max) is logged at most every 'every'
+        seconds (as given first for them), and on close().
+        """
+        level = level_method(level)
+        if every is None:
+            return Timed(self, label, level)
+
+        timed = self._timings.get((label, level))
+        if timed is None:
+            timed = self._timings.setdefault((label, level), Timed(self, label, level, TimingStats(every)))
+
+        return timed._recreate_cm()
+
+    def flush(self):
+        """Make sure everything logged so far has been written."""
+
+        for handler in self._attached:
+            handler.flush()
+
+    def close(self):
+        """Flush, and release the handlers of this Logger. Handlers not used by any other Logger()
+        are detached and closed. This also happens when the Logger is garbage-collected.
+        """
+        for timed in list(self._timings.values()):
+            summary = timed.timing.take()
+            if summary is not None:
+                timed.log_summary(summary)
+
+        if self.limiter is not None:
+            self._log_suppressed(self.limiter.take_summary())
+
+        for handler in self._attached:
+            handler.flush()
+
+        self._finalizer()
+        self._attached = []
+        self.handlers = []
 
     def with_debug_color(self, text):
         """Return 'text' with color for name."""
@@ -160,6 +1903,63 @@ class Logger(object):
         return self._colorize_as(text, "warning")
 
     # Private methods:
+    def _bind_levels(self):
+        """Bind the level methods to a no-op if their level is disabled, and back to the real
+        thing if it is enabled.
+        """
+        for which, number in LEVEL_NUMBERS.items():
+            if not self.logger.isEnabledFor(number):
+                self.__dict__[which] = _noop
+            elif self.limiter is not None:
+                self.__dict__[which] = self._limited(which)
+            else:
+                self.__dict__.pop(which, None)
+
+    def _limited(self, which):
+        """Return level method 'which', rate limited by self.limiter, per call site and message.
+        The counts of suppressed records are logged every limiter.interval seconds (checked on calls).
+        It holds this Logger through a weak reference, so that it can still be collected right away.
+        """
+        method = getattr(type(self), which)
+        limiter = self.limiter
+        logger_ref = weakref.ref(self)
+
+        def limited(text, *args):
+            logger = logger_ref()
+            if logger is None:
+                return
+
+            caller = sys._getframe(1)
+            if limiter.allow((which, caller.f_code, caller.f_lineno, text if isinstance(text, str) else None)):
+                method(logger, text, *args)
+
+            if limiter.due:
+                logger._log_suppressed(limiter.take_summary())
+
+        return limited
+
+    def _log_suppressed(self, summary):
+        """Log a line for each (key, suppressed count) in 'summary', at the level of the suppressed records."""
+
+        for key, count in summary:
+            if key is None:
+                Logger.warning(self, "Suppressed %d similar messages, from call sites no longer tracked", count)
+                continue
+
+            which, code, lineno, text = key
+            getattr(type(self), which)(self, "Suppressed %d similar messages, from %s:%d: %s",
+                                       count, code.co_filename, lineno, text or "(computed)")
+
+    def _build_tags(self):
+        """Precompute the (maybe colored) level tags, and the 'extra' dicts passed on each call. Records
+        get the tag as 'clevelname', and the logworks level name ("info", "ok"...) as 'lwlevel'.
+        Called whenever 'conf' or 'no_color' change. In-place changes to 'conf' need an explicit call.
+        """
+        self._tags = MappingProxyType({which: self._colorize_as(tag, which) for which, tag in LEVEL_TAGS})
+        self._extras = MappingProxyType({
+            which: MappingProxyType({"clevelname": tag, "lwlevel": which}) for which, tag in self._tags.items()
+        })
+
     def _colorize_as(self, text, which):
         """Return 'text' with color for 'which' type of text."""
 
@@ -177,6 +1977,34 @@ class Logger(object):
             return 0
 
     # Public properties:
+    @property
+    def conf(self):
+        """Return configuration dictionary."""
+
+        return self._conf
+
+    @conf.setter
+    def conf(self, conf):
+        self._conf = conf
+        self._build_tags()
+
+    @property
+    def no_color(self):
+        """Return True if colors have been explicitly disabled."""
+
+        return self._no_color
+
+    @no_color.setter
+    def no_color(self, no_color):
+        self._no_color = no_color
+        self._build_tags()
+
+    @property
+    def tags(self):
+        """Return read-only mapping of level ("info", "ok"...) to its (maybe colored) tag."""
+
+        return self._tags
+
     @property
     def use_colors(self):
         """Return True if colors should be used in terminal.
@@ -188,21 +2016,47 @@ class Logger(object):
         return "colorize" in self.conf and self.conf["colorize"]
 
     # Static methods:
+    @staticmethod
+    def _new_handler(handler, formatter, level=None):
+        """Return 'handler', with 'formatter' and 'level' set."""
+
+        handler.setFormatter(formatter)
+        if level is not None:
+            handler.setLevel(level)
+
+        return handler
+
     @staticmethod
     def read_conf(fn=None):
-        """Read configuration file 'fn' and return dictionary with configuration.
-        Return empty dir if we couldn't read.
+        """Read configuration file 'fn' and return mapping with configuration.
+        Return empty dir if we couldn't read. The mapping is read-only (see _frozen()), cached, and
+        shared by all callers, until the file is modified.
         """
         if not fn:
             return {}
 
+        path = os.path.abspath(fn)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime = None
+
+        cached = _CONFS.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
         try:
             with open(fn) as f_conf:
-                return json.load(f_conf)
+                conf = _frozen(json.load(f_conf))
         except FileNotFoundError:
             print("Could not read logger configuration file '{f}'. Ignoring...".format(f=fn))
             return {}
 
+        if mtime is not None:
+            _CONFS[path] = (mtime, conf)
+
+        return conf
+
     @staticmethod
     def colorize(text, color_number=None):
         """Return colorized version of 'text', with terminal color 'color_number' (31, 32...).
@@ -217,6 +2071,8 @@ class Logger(object):
 class ConsoleLogger(Logger):
     """A Logger() for console output only."""
 
+    default_level = logging.DEBUG
+
     # Constructor:
     def __init__(self,
                  logfile=None,
@@ -224,7 +2080,7 @@ class ConsoleLogger(Logger):
                  console_formatter=DEFAULT_CONSOLE_FORMATTER,
                  which_logger=__name__,
                  use_color=True,
-                 level=logging.DEBUG):
+                 level=None):
         super().__init__(
                 conf_fn=conf_fn,
                 console_formatter=console_formatter,
@@ -237,7 +2093,14 @@ class ConsoleLogger(Logger):
 
 
 class FileLogger(Logger):
-    """A Logger() for file output only."""
+    """A Logger() for file output only.
+    If 'buffered', see BufferedFileHandler() for 'buffer_size' and 'flush_interval'. Either way,
+    file_handler.flushes and file_handler.bytes_written count the writes to the file.
+    The 'rotation' policy (see SharedFile) defaults to the "rotation" in the configuration file, if any.
+    If 'binary', records are written unformatted, in binary (see BinaryFile), and not buffered.
+    """
+
+    default_level = logging.DEBUG
 
     # Constructor:
     def __init__(self,
@@ -245,7 +2108,12 @@ class FileLogger(Logger):
                  conf_fn=None,
                  file_formatter=DEFAULT_FILE_FORMATTER,
                  which_logger=__name__,
-                 level=logging.DEBUG):
+                 level=None,
+                 buffered=False,
+                 buffer_size=65536,
+                 flush_interval=1.0,
+                 rotation=None,
+                 binary=False):
         super().__init__(
                 conf_fn=conf_fn,
                 file_formatter=file_formatter,
@@ -254,5 +2122,163 @@ class FileLogger(Logger):
                 console_output=False,
                 file_output=True,
                 use_color=False,
-                logfile=logfile)
+                logfile=logfile,
+                buffered=buffered,
+                buffer_size=buffer_size,
+                flush_interval=flush_interval,
+                rotation=rotation,
+                binary=binary)
+
+
+class QueueLogger(Logger):
+    """A Logger() whose output is written by a background thread, to never block the caller.
+    See BackgroundHandler() for 'queue_size' and 'overflow'. Accepts all other Logger() arguments.
+    """
+
+    # Constructor:
+    def __init__(self, queue_size=10000, overflow="block", **kwargs):
+        super().__init__(async_io=True, queue_size=queue_size, overflow=overflow, **kwargs)
+
+
+class MemoryLogger(Logger):
+    """A Logger() keeping the latest 'capture' records in memory only (see RingHandler).
+    They can be queried with captured(), and be dumped to 'dump_to' file whenever an error is logged.
+    """
+
+    default_level = logging.DEBUG
+
+    # Constructor:
+    def __init__(self,
+                 capture=1000,
+                 dump_to=None,
+                 conf_fn=None,
+                 file_formatter=DEFAULT_FILE_FORMATTER,
+                 which_logger=__name__,
+                 level=None):
+        super().__init__(
+                conf_fn=conf_fn,
+                file_formatter=file_formatter,
+                which_logger=which_logger,
+                level=level,
+                console_output=False,
+                file_output=False,
+                use_color=False,
+                capture=capture,
+                dump_to=dump_to)
+
+
+class BoundLogger(object):
+    """Child of a Logger() 'parent', returned by its bind(): it logs through the parent (same handlers,
+    level, configuration and rate limiting), adding the 'fields' to every record. Those are merged
+    into the 'extra' dicts of the parent once per level, and again only when the parent rebuilds
+    them (e.g. on a change of colors). Any other attribute is that of the parent, which is kept
+    alive as long as the child is. Closing the child just flushes.
+    """
+
+    __slots__ = ("_parent", "_bound", "_cache")
+
+    # Constructor:
+    def __init__(self, parent, fields):
+        if not RESERVED_FIELDS.isdisjoint(fields):
+            raise ValueError("Can't bind reserved record attributes: {r}".format(
+                r=", ".join(sorted(RESERVED_FIELDS.intersection(fields)))))
+
+        self._parent = parent
+        self._bound = fields
+        self._cache = _NOT_CACHED  # (extras of parent, {level: those plus fields})
+
+    def __getattr__(self, name):
+        """Return attribute 'name' of the parent. Only called for those not found in the child."""
+
+        try:
+            parent = object.__getattribute__(self, "_parent")
+        except AttributeError:  # not set yet (e.g. in copy or pickle): no parent to ask
+            raise AttributeError(name) from None
+
+        return getattr(parent, name)
+
+    # Public methods:
+    def debug(self, text, *args):
+        """Log (print) 'text' as debug, with the bound fields. See Logger.debug()."""
+
+        logger = self._parent.logger
+        if logger.isEnabledFor(logging.DEBUG) and self._allowed("debug", text):
+            logger.debug(_lazy(text), *args, extra=self._extra("debug"))
+
+    def info(self, text, *args):
+        """Log (print) 'text' as info, with the bound fields. See Logger.info()."""
+
+        logger = self._parent.logger
+        if logger.isEnabledFor(logging.INFO) and self._allowed("info", text):
+            logger.info(_lazy(text), *args, extra=self._extra("info"))
+
+    def ok(self, text, *args):
+        """Log (print) 'text' as OK, with the bound fields. See Logger.ok()."""
+
+        logger = self._parent.logger
+        if logger.isEnabledFor(logging.INFO) and self._allowed("ok", text):
+            logger.info(_lazy(text), *args, extra=self._extra("ok"))
+
+    def warning(self, text, *args):
+        """Log (print) 'text' as warning, with the bound fields. See Logger.warning()."""
+
+        logger = self._parent.logger
+        if logger.isEnabledFor(logging.WARNING) and self._allowed("warning", text):
+            logger.warning(_lazy(text), *args, extra=self._extra("warning"))
+
+    def error(self, text, *args):
+        """Log (print) 'text' as error, with the bound fields. See Logger.error()."""
+
+        logger = self._parent.logger
+        if logger.isEnabledFor(logging.ERROR) and self._allowed("error", text):
+            logger.error(_lazy(text), *args, extra=self._extra("error"))
+
+    def bind(self, **fields):
+        """Return a BoundLogger of the same parent, with 'fields' on top of those bound to this one."""
+
+        return BoundLogger(self._parent, dict(self._bound, **fields))
+
+    def timed(self, label, level="ok", every=None):
+        """See Logger.timed(). Times are logged with the bound fields, but aggregated ones (with
+        'every') are shared with the parent, and summarized by it, without them.
+        """
+        if every is None:
+            return Timed(self, label, level_method(level))
+
+        return self._parent.timed(label, level, every)
+
+    def close(self):
+        """Flush. The handlers are those of the parent, and stay open."""
+
+        self._parent.flush()
+
+    # Private methods:
+    def _extra(self, which):
+        """Return 'extra' dict for level 'which': that of the parent, plus the bound fields."""
+
+        extras = self._parent._extras
+        cached_extras, merged = self._cache
+        if cached_extras is not extras:  # first use, or rebuilt by the parent
+            merged = {}
+            self._cache = (extras, merged)
+
+        extra = merged.get(which)
+        if extra is None:
+            extra = merged[which] = MappingProxyType(dict(extras[which], **self._bound, lwbound=tuple(self._bound)))
+
+        return extra
+
+    def _allowed(self, which, text):
+        """Return True if the rate limiter of the parent, if any, lets a record of level 'which'
+        through, from the caller of our level method (see Logger._limited()).
+        """
+        limiter = self._parent.limiter
+        if limiter is None:
+            return True
+
+        caller = sys._getframe(2)
+        allowed = limiter.allow((which, caller.f_code, caller.f_lineno, text if isinstance(text, str) else None))
+        if limiter.due:
+            self._parent._log_suppressed(limiter.take_summary())
 
+        return allowed
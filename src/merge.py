@@ -0,0 +1,75 @@
+"""Merge any number of log files written by logworks (e.g. one per process, or host) into a single
+timeline, streaming: only one record (and a read buffer) per file is held in memory at a time.
+
+    python -m logworks.merge worker-*.log [-l error -l warning] [-o all.log]
+"""
+
+# Standard libs:
+import sys
+import heapq
+import argparse
+
+# Our libs:
+from . import logworks
+from . import reader
+
+
+# Functions:
+def merge(paths, levels=None, template=logworks.DEFAULT_FILE_FORMAT, date_format=logworks.DEFAULT_DATE_FORMAT):
+    """Yield the ParsedRecord of all files in 'paths' (written with 'template' and 'date_format', as
+    given to get_formatter()), in order of creation time. Each file is expected to be in order
+    itself, as written by a logger. Records created at the same time keep the order of 'paths'.
+    If 'levels' given (e.g. ["error", "warning"]), only records of those levels are yielded. Note
+    that, with DEFAULT_FILE_FORMAT, OK records are written (and read) as "info".
+    """
+    if levels is not None:
+        levels = {level.lower() for level in levels}
+
+    inputs = [_filtered(reader.read(path, template, date_format), levels) for path in paths]
+
+    return heapq.merge(*inputs, key=_created)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Merge log files into one, in chronological order.")
+    parser.add_argument("paths", nargs="+", help="Log files.")
+    parser.add_argument("-l", "--level", action="append",
+                        help="Only records of this level (can be given many times). Default: all.")
+    parser.add_argument("-o", "--output", help="Write to this file, instead of standard output.")
+    parser.add_argument("-t", "--template", default=logworks.DEFAULT_FILE_FORMAT,
+                        help="Template the files were written with. Default: '{t}'.".format(
+                            t=logworks.DEFAULT_FILE_FORMAT.replace("%", "%%")))
+    parser.add_argument("-d", "--date-format", default=logworks.DEFAULT_DATE_FORMAT,
+                        help="Date format the files were written with. Default: '{d}'.".format(
+                            d=logworks.DEFAULT_DATE_FORMAT.replace("%", "%%")))
+    opts = parser.parse_args(args)
+
+    output = open(opts.output, "w") if opts.output else sys.stdout
+    try:
+        for record in merge(opts.paths, opts.level, opts.template, opts.date_format):
+            output.write(record.text + "\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+def _filtered(records, levels):
+    """Yield those of 'records' of any of 'levels' (all, if None)."""
+
+    if levels is None:
+        yield from records
+        return
+
+    for record in records:
+        if record.level in levels:
+            yield record
+
+
+def _created(record):
+    """Sort key of 'record': its creation time (0 for lines with no time, at the start of a file)."""
+
+    return record.created or 0.0
+
+
+if __name__ == "__main__":
+    main()
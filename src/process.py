@@ -0,0 +1,157 @@
+"""Multiprocess-safe logging: any number of processes send their records to a single writer
+process, which is the only one writing to the log file.
+"""
+
+# Standard libs:
+import os
+import atexit
+import logging
+import weakref
+import multiprocessing
+
+# Our libs:
+from . import logworks
+
+
+# Globals:
+BATCH_SIZE = 1000  # maximum records written at once by the writer process
+STOP_TIMEOUT = 10.0  # seconds to wait at exit for the writer process to write what it was sent
+
+
+# Functions:
+def compact(record):
+    """Return LogRecord 'record' as a compact tuple, cheap to pickle: only what a file formatter needs,
+    with the message already formatted (and any exception and stack info, too, as a formatter would append them).
+    """
+    return record.name, record.levelno, getattr(record, "lwlevel", None), record.created, logworks._full_message(record)
+
+
+def write_from_queue(queue, path, formatter, rotation=None):
+    """Main function of the writer process. Take records (as per compact()) from 'queue' and
+    write them to 'path' with 'formatter' (and 'rotation' policy), until a None arrives.
+    """
+    handler = logworks.PooledFileHandler(path, rotation)
+    handler.setFormatter(formatter)
+
+    try:
+        running = True
+        while running:
+            batch = [queue.get()]
+            while batch[-1] is not None and len(batch) < BATCH_SIZE and not queue.empty():
+                batch.append(queue.get())
+
+            if batch[-1] is None:
+                running = False
+                batch.pop()
+
+            if batch:
+                handler.emit_batch([logworks.make_record(*item) for item in batch])
+    finally:
+        handler.close()
+
+
+def stop_writer(queue, process, owner_pid, timeout=None):
+    """Tell writer 'process' to stop, once everything already in 'queue' is written, and wait for it
+    (at most 'timeout' seconds, if given; then it is terminated). Do nothing if we are not the
+    process 'owner_pid' which started it (e.g., we are a fork of it).
+    """
+    if os.getpid() == owner_pid and process.is_alive():
+        queue.put(None)
+        process.join(timeout)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+
+
+# Classes:
+class QueueSenderHandler(logging.Handler):
+    """Handler sending records (as per compact()) to a multiprocessing.SimpleQueue. Each record
+    is written to the pipe before emit() returns (there is no feeder thread), so none is lost if
+    the process is killed right after logging (e.g. by multiprocessing.Pool.terminate()).
+    """
+
+    # Constructor:
+    def __init__(self, queue):
+        super().__init__()
+        self.queue = queue
+
+    # Public methods:
+    def emit(self, record):
+        """Send 'record' to the queue."""
+
+        try:
+            self.queue.put(compact(record))
+        except Exception:
+            self.handleError(record)
+
+
+class ProcessLogger(logworks.Logger):
+    """A Logger() for file output only, safe to use from many processes at once.
+
+    Created without a 'queue', it starts a (daemon) writer process, which owns the log file,
+    and which is stopped (after writing everything sent to it) by close() or at exit (waiting
+    at most STOP_TIMEOUT seconds). Any process forked afterwards can use the same ProcessLogger.
+    Other processes can create their own ProcessLogger with the 'queue' of the first one, and
+    they will send their records to it. The writer gets 'file_formatter' itself, so it must be
+    picklable, if processes are spawned rather than forked.
+    """
+
+    default_level = logging.DEBUG
+
+    # Constructor:
+    def __init__(self,
+                 logfile=None,
+                 conf_fn=None,
+                 file_formatter=logworks.DEFAULT_FILE_FORMATTER,
+                 which_logger=__name__,
+                 level=None,
+                 queue=None,
+                 rotation=None):
+        super().__init__(
+                conf_fn=conf_fn,
+                which_logger=which_logger,
+                level=level,
+                console_output=False,
+                file_output=False,
+                use_color=False)
+
+        # Writer process, if we own it:
+        self.writer_process = None
+        self._owner_pid = os.getpid()
+        if queue is None:
+            path = logfile or self.conf.get("logfile", None) or logworks.DEFAULT_CONF["logfile"]
+            if rotation is None:
+                rotation = self.conf.get("rotation", None)
+            if rotation is not None:
+                rotation = dict(rotation)  # picklable, even if read-only mapping from conf
+            if type(file_formatter) is logworks.Formatter:  # same output, faster
+                file_formatter = logworks.get_formatter(
+                    format=file_formatter._fmt, date_format=file_formatter.datefmt, compiled=True)
+            queue = multiprocessing.SimpleQueue()
+            self.writer_process = multiprocessing.Process(
+                target=write_from_queue,
+                args=(queue, os.path.abspath(path), file_formatter, rotation),
+                name="logworks-writer",
+                daemon=True,
+            )
+            self.writer_process.start()
+            atexit.register(stop_writer, queue, self.writer_process, self._owner_pid, STOP_TIMEOUT)
+
+        self.queue = queue
+
+        # Handler sending to the writer:
+        key = (which_logger, "process", queue)
+        self.sender = logworks._acquire_handler(self.logger, key, lambda: QueueSenderHandler(queue))
+        self.handlers.append(self.sender)
+        self._sender_finalizer = weakref.finalize(self, logworks._release_handlers, self.logger, [key])
+
+    # Public methods:
+    def close(self):
+        """Release the handlers of this Logger and, if we own the writer process, stop it after it
+        writes everything sent so far.
+        """
+        super().close()
+        self._sender_finalizer()
+
+        if self.writer_process is not None:
+            stop_writer(self.queue, self.writer_process, self._owner_pid)
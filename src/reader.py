@@ -0,0 +1,246 @@
+"""Streaming reader of log files written by logworks (with DEFAULT_FILE_FORMATTER, or any template
+given to get_formatter()), yielding one compact ParsedRecord per record, in constant memory:
+
+    for record in reader.read("jobs.log"):
+        print(record.created, record.level, record.message)
+
+With follow=True, it keeps waiting for new records, as "tail -f" would.
+"""
+
+# Standard libs:
+import os
+import re
+import time
+import string
+import functools
+
+# Our libs:
+from . import logworks
+
+
+# Globals:
+FOLLOW_INTERVAL = 0.5  # seconds between checks for more data, in follow mode
+CHUNK_SIZE = 65536
+
+# Regex matching what each strftime directive produces:
+DATE_DIRECTIVES = {
+    "Y": r"\d{4}", "y": r"\d\d", "m": r"\d\d", "d": r"\d\d", "H": r"\d\d", "I": r"\d\d", "M": r"\d\d",
+    "S": r"\d\d", "f": r"\d{6}", "j": r"\d{3}", "a": r"\w+", "A": r"\w+", "b": r"\w+", "B": r"\w+",
+    "p": r"\w+", "z": r"[+-]\d{4}", "Z": r"\w*", "%": "%",
+}
+
+# Regex matching each LogRecord attribute, where more specific than "anything":
+FIELD_PATTERNS = {
+    "levelname": r"[A-Za-z]+",
+    "clevelname": r"(?:\x1b\[\d+m)?\[[A-Za-z]+\](?:\x1b\[0m)?",
+    "levelno": r"\d+",
+    "lineno": r"\d+",
+    "process": r"\d+",
+    "thread": r"\d+",
+    "created": r"\d+(?:\.\d+)?",
+    "msecs": r"\d+(?:\.\d+)?",
+    "relativeCreated": r"\d+(?:\.\d+)?",
+    "message": r".*",
+}
+ANSI_CODE = re.compile(r"\x1b\[\d+m")
+
+
+# Functions:
+@functools.lru_cache(maxsize=64)
+def template_regex(template=logworks.DEFAULT_FILE_FORMAT, date_format=logworks.DEFAULT_DATE_FORMAT):
+    """Return compiled regex matching the first line of records formatted with '{'-style 'template'
+    (and 'date_format' for "asctime", or the logging default, with milliseconds, if None). Each field
+    is a named group. Built once per template.
+    """
+    pieces = []
+    seen = set()
+    for literal, field, spec, conversion in string.Formatter().parse(template):
+        pieces.append(re.escape(literal))
+        if field is None:
+            continue
+
+        if field in seen:  # repeated
+            pieces.append("(?P={f})".format(f=field))
+            continue
+
+        if field == "asctime":
+            pattern = _date_regex(date_format)
+        elif spec and field != "message":  # padded, or truncated
+            pattern = r".*?"
+        else:
+            pattern = FIELD_PATTERNS.get(field, r".*?")
+
+        pieces.append("(?P<{f}>{p})".format(f=field, p=pattern))
+        seen.add(field)
+
+    return re.compile("".join(pieces) + "$")
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_time(text, date_format=logworks.DEFAULT_DATE_FORMAT):
+    """Return seconds since epoch of local time 'text', formatted with 'date_format' (or the
+    logging default, "%Y-%m-%d %H:%M:%S,mmm", if None). Cached, as records of a second share it.
+    """
+    if date_format is None:
+        text, _, msecs = text.partition(",")
+        return time.mktime(time.strptime(text, logworks.Formatter.default_time_format)) + int(msecs) / 1000
+
+    return time.mktime(time.strptime(text, date_format))
+
+
+def read(path, template=logworks.DEFAULT_FILE_FORMAT, date_format=logworks.DEFAULT_DATE_FORMAT,
+         offset=0, follow=False, encoding="utf-8"):
+    """Yield a ParsedRecord for each record in file 'path' written with 'template' and 'date_format'
+    (as given to get_formatter()), starting at byte 'offset'. Lines not matching the template are
+    appended to the message of the record before them (tracebacks and such); any such lines at
+    'offset' make a record of their own, with no time or level.
+    If 'follow', never stop: wait for more to be appended (or for the file to be rotated or
+    truncated, and then go on from its start). A record is only yielded when the next one begins,
+    or when nothing is appended for FOLLOW_INTERVAL seconds.
+    """
+    regex = template_regex(template, date_format)
+    pending = None  # (offset, match, lines) of the record being read
+
+    for line_offset, line in _lines(path, offset, follow, encoding):
+        if line is None:  # nothing new for a while
+            if pending is not None:
+                yield _parsed(pending, date_format)
+                pending = None
+            continue
+
+        match = regex.match(line)
+        if match is None and pending is not None:
+            pending[2].append(line)
+            continue
+
+        if pending is not None:
+            yield _parsed(pending, date_format)
+        pending = (line_offset, match, [line])
+
+    if pending is not None:
+        yield _parsed(pending, date_format)
+
+
+def _date_regex(date_format):
+    """Return regex matching dates formatted with 'date_format' (or logging default, if None)."""
+
+    if date_format is None:
+        return _date_regex(logworks.Formatter.default_time_format) + r",\d{3}"
+
+    pieces = re.split(r"%(.)", date_format)
+    for i, piece in enumerate(pieces):
+        if i % 2:
+            pieces[i] = DATE_DIRECTIVES.get(piece, r".+?")
+        else:
+            pieces[i] = re.escape(piece)
+
+    return "".join(pieces)
+
+
+def _lines(path, offset, follow, encoding):
+    """Yield (offset, line) for each complete line (without newline) of file 'path', from byte
+    'offset' on. If 'follow', go on forever, yielding (offset, None) whenever idle, and start over
+    from the new file whenever 'path' is truncated or replaced. Only new data is ever read.
+    """
+    f = open(path, "rb")
+    try:
+        f.seek(offset)
+        buffered = b""
+        idle = False
+        replaced = False
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if chunk:
+                idle = False
+                lines = (buffered + chunk).split(b"\n")
+                buffered = lines.pop()
+                for line in lines:
+                    yield offset, line.decode(encoding, "replace")
+                    offset += len(line) + 1
+                continue
+
+            if not follow:
+                break
+
+            if replaced:  # and what was left in the old one read: go on with the new one
+                if buffered:
+                    yield offset, buffered.decode(encoding, "replace")
+                f.close()
+                f = open(path, "rb")
+                offset = 0
+                buffered = b""
+                replaced = False
+                continue
+
+            if not idle:
+                idle = True
+                yield offset, None
+
+            time.sleep(FOLLOW_INTERVAL)
+            try:
+                stat = os.stat(path)
+            except OSError:  # being rotated
+                continue
+
+            if stat.st_ino != os.fstat(f.fileno()).st_ino:
+                replaced = True
+            elif stat.st_size < offset + len(buffered):  # truncated
+                f.seek(0)
+                offset = 0
+                buffered = b""
+
+        if buffered:  # last line, with no newline
+            yield offset, buffered.decode(encoding, "replace")
+    finally:
+        f.close()
+
+
+def _parsed(pending, date_format):
+    """Return ParsedRecord out of 'pending' (offset, match, lines)."""
+
+    offset, match, lines = pending
+    record = ParsedRecord(offset, "\n".join(lines))
+    if match is None:
+        record.message = record.text
+        return record
+
+    fields = match.groupdict()
+    if "asctime" in fields:
+        record.created = parse_time(fields["asctime"], date_format)
+        if "msecs" in fields and date_format is not None:
+            record.created += float(fields["msecs"]) / 1000
+    elif "created" in fields:
+        record.created = float(fields["created"])
+
+    if "clevelname" in fields:
+        record.level = ANSI_CODE.sub("", fields["clevelname"]).strip("[]").lower()
+    elif "levelname" in fields:
+        record.level = fields["levelname"].lower()
+
+    record.name = fields.get("name")
+    if "message" in fields:
+        record.message = "\n".join([fields["message"]] + lines[1:])
+
+    return record
+
+
+# Classes:
+class ParsedRecord(object):
+    """Compact record read back from a log file: byte 'offset' where it starts, creation time
+    ('created', as seconds since epoch), 'level' ("info", "ok"..., if in the template), logger
+    'name' (if in the template), 'message' (with any continuation lines) and whole 'text'.
+    """
+
+    __slots__ = ("offset", "created", "level", "name", "message", "text")
+
+    # Constructor:
+    def __init__(self, offset, text):
+        self.offset = offset
+        self.created = None
+        self.level = None
+        self.name = None
+        self.message = None
+        self.text = text
+
+    def __repr__(self):
+        return "ParsedRecord({o}, {t!r})".format(o=self.offset, t=self.text)
@@ -0,0 +1,98 @@
+# Standard libs:
+import os
+import asyncio
+import logging
+import tempfile
+import unittest
+
+# Our libs:
+from src import aio
+from src import logworks
+
+
+# Classes:
+class TestAsyncLogger(unittest.TestCase):
+    """Test AsyncLogger() class."""
+
+    # Setup and teardown:
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.logfile = os.path.join(self.tmpdir.name, "aio.log")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    # Helper methods:
+    def make_logger(self, **kwargs):
+        return aio.AsyncLogger(
+            which_logger="TestAsyncLogger",
+            console_output=False,
+            logfile=self.logfile,
+            level=logging.DEBUG,
+            file_formatter=logworks.get_formatter(format="{clevelname} {message}"),
+            use_color=False,
+            **kwargs
+        )
+
+    def read(self):
+        with open(self.logfile) as f:
+            return f.read()
+
+    # Tests:
+    def test_constructor(self):
+        # Run:
+        logger = self.make_logger()
+
+        # Assert:
+        self.assertIsInstance(logger.writer, logworks.BackgroundHandler)
+        self.assertEqual(logger.writer.overflow, "drop_oldest")
+
+        # Clean:
+        logger.close()
+
+    def test_flush(self):
+        # Prepare:
+        async def main():
+            logger = self.make_logger()
+            logger.info("one")
+            logger.ok("two")
+            await logger.flush()
+            text = self.read()
+            await logger.aclose()
+
+            return text
+
+        # Run:
+        text = asyncio.run(main())
+
+        # Assert:
+        self.assertEqual(text, "[INFO] one\n[OK] two\n")
+
+    def test_colors(self):
+        # Prepare:
+        async def main():
+            logger = self.make_logger()
+            logger.no_color = False
+            logger.ok("green")
+            await logger.aclose()
+
+        # Run:
+        asyncio.run(main())
+
+        # Assert:
+        self.assertEqual(self.read(), logworks.Logger.colorize("[OK]", 32) + " green\n")
+
+    def test_aclose(self):
+        # Prepare:
+        async def main():
+            async with self.make_logger() as logger:
+                logger.warning("bye")
+
+            return logger
+
+        # Run:
+        logger = asyncio.run(main())
+
+        # Assert:
+        self.assertEqual(self.read(), "[WARNING] bye\n")
+        self.assertFalse(logger.writer._thread.is_alive())
@@ -0,0 +1,73 @@
+# Standard libs:
+import os
+import json
+import mock
+import tempfile
+import unittest
+from io import StringIO
+
+# Our libs:
+from src import bench
+
+
+# Classes:
+class TestBench(unittest.TestCase):
+    """Test benchmark helpers (with very few calls, as we only check they work)."""
+
+    def test_time_per_call(self):
+        # Run:
+        ret = bench.time_per_call(lambda: None, 10)
+
+        # Assert:
+        self.assertGreater(ret, 0)
+
+    def test_allocations_per_call(self):
+        # Run:
+        ret = bench.allocations_per_call(lambda: None, 10)
+
+        # Assert:
+        self.assertEqual(set(ret), {"peak_bytes", "blocks_per_call"})
+
+    def test_bench_formatters(self):
+        # Run:
+        ret = bench.bench_formatters(10)
+
+        # Assert:
+        for which in ("console", "file"):
+            self.assertEqual(set(ret[which]), {"stdlib", "cached_time", "compiled"})
+
+    def test_bench_loggers(self):
+        # Run:
+        ret = bench.bench_loggers(2)
+
+        # Assert:
+        loggers = {row["logger"] for row in ret}
+        self.assertEqual(loggers, {"logging", "ConsoleLogger", "FileLogger"})
+        self.assertEqual(len(ret), (2 + (4 + 2) * 2) * 2 * len(bench.LEVELS))
+        self.assertEqual({(row["formatter"], row["compiled"]) for row in ret if row["logger"] == "FileLogger"},
+                         {("default", False), ("default", True), ("custom", False), ("custom", True)})
+        for row in ret:
+            self.assertIn("ns_per_call", row)
+            self.assertIn(row["level"], bench.LEVELS)
+
+    def test_main(self):
+        # Run:
+        with mock.patch("sys.stdout", new_callable=StringIO) as stdout:
+            bench.main(["-n", "2"])
+
+        # Assert:
+        results = json.loads(stdout.getvalue())
+        self.assertIn("formatters", results)
+        self.assertIn("loggers", results)
+
+    def test_main_output(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # Prepare:
+            output = os.path.join(tmpdir, "results.json")
+
+            # Run:
+            bench.main(["-n", "2", "-o", output])
+
+            # Assert:
+            with open(output) as f:
+                self.assertEqual(json.load(f)["number"], 2)
@@ -0,0 +1,159 @@
+# Standard libs:
+import os
+import mock
+import random
+import logging
+import tempfile
+import unittest
+from io import StringIO
+
+# Our libs:
+from src import logworks
+from src import binary
+
+
+# Classes:
+class TestBinary(unittest.TestCase):
+    """Test writing binary log files, and reading them back."""
+
+    # Setup and teardown:
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.text_path = os.path.join(self.tmpdir.name, "test.log")
+        self.binary_path = os.path.join(self.tmpdir.name, "test.lwb")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    # Tests:
+    def test_same_as_text(self):
+        # Prepare (text and binary handlers get the very same records):
+        loggers = []
+        for name in ("TestBinary", "TestBinary.other"):
+            loggers.append(logworks.FileLogger(logfile=self.text_path, which_logger=name))
+            loggers.append(logworks.FileLogger(logfile=self.binary_path, which_logger=name, binary=True))
+        logger, other = loggers[1], loggers[3]
+        other.logger.propagate = False
+
+        # Run:
+        logger.debug("debug %d", 1)
+        logger.info("info")
+        logger.ok("ok\nin two lines")
+        other.warning("from other logger, ñ")
+        logger.error("")
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            logger.logger.error("failed", exc_info=True)
+        logger.logger.critical("critical")
+        for each in loggers:
+            each.close()
+
+        # Assert:
+        output = StringIO()
+        count = binary.export(self.binary_path, output)
+        with open(self.text_path) as f:
+            expected = f.read()
+        self.assertEqual(count, 7)
+        self.assertIn("ZeroDivisionError", expected)
+        self.assertEqual(output.getvalue(), expected)
+
+    def test_records(self):
+        # Prepare:
+        logger = logworks.FileLogger(logfile=self.binary_path, which_logger="TestBinaryRecords", binary=True)
+        logger.ok("fine")
+        logger.warning("careful")
+        logger.close()
+
+        # Run:
+        records = list(binary.records(self.binary_path))
+
+        # Assert:
+        self.assertEqual([(r.name, r.levelno, r.lwlevel, r.getMessage()) for r in records], [
+            ("TestBinaryRecords", logging.INFO, "ok", "fine"),
+            ("TestBinaryRecords", logging.WARNING, "warning", "careful"),
+        ])
+        self.assertEqual(logger.file_handler.flushes, 2)
+
+    def test_exact_msecs(self):
+        # Prepare (times with msecs computed as a LogRecord does):
+        generator = random.Random(12345)
+        record = logging.makeLogRecord({})
+
+        for _ in range(20000):
+            record.created = generator.uniform(1.7e9, 1.8e9)
+            record.msecs = int((record.created - int(record.created)) * 1000) + 0.0
+
+            # Run:
+            decoded = binary._record("name", logworks._created_ns(record), logging.INFO, "message")
+
+            # Assert:
+            self.assertEqual((int(decoded.created), decoded.msecs), (int(record.created), record.msecs))
+
+    def test_append_in_new_session(self):
+        # Prepare:
+        for message in ("first", "second"):  # string table started over, in the same file
+            logger = logworks.FileLogger(logfile=self.binary_path, which_logger="TestBinaryAppend", binary=True)
+            logger.info(message)
+            logger.close()
+
+        # Run:
+        records = list(binary.records(self.binary_path))
+
+        # Assert:
+        self.assertEqual([r.getMessage() for r in records], ["first", "second"])
+
+    def test_truncated(self):
+        # Prepare:
+        logger = logworks.FileLogger(logfile=self.binary_path, which_logger="TestBinaryTruncated", binary=True)
+        logger.info("complete")
+        logger.info("incomplete")
+        logger.close()
+        with open(self.binary_path, "r+b") as f:
+            f.truncate(os.path.getsize(self.binary_path) - 3)
+
+        # Run:
+        records = list(binary.records(self.binary_path))
+
+        # Assert:
+        self.assertEqual([r.getMessage() for r in records], ["complete"])
+
+    def test_not_binary(self):
+        # Prepare:
+        with open(self.text_path, "w") as f:
+            f.write("some text\n")
+
+        # Assert:
+        with self.assertRaises(ValueError):
+            list(binary.records(self.text_path))
+
+    def test_same_file_as_text(self):
+        # Prepare:
+        logger = logworks.FileLogger(logfile=self.binary_path, which_logger="TestBinaryMixed1", binary=True)
+
+        # Assert:
+        with self.assertRaises(ValueError):
+            logworks.FileLogger(logfile=self.binary_path, which_logger="TestBinaryMixed2")
+
+        # Clean:
+        logger.close()
+
+    def test_main(self):
+        # Prepare:
+        logger = logworks.FileLogger(logfile=self.binary_path, which_logger="TestBinaryMain", binary=True)
+        logger.error("boom")
+        logger.close()
+
+        # Run:
+        binary.main([self.binary_path, "-o", self.text_path])
+        with mock.patch("sys.stdout", new_callable=StringIO) as stdout:
+            binary.main([self.binary_path, "-t", "{levelname}: {message}"])
+
+        # Assert:
+        with open(self.text_path) as f:
+            self.assertTrue(f.read().endswith(" [ERROR] boom\n"))
+        self.assertEqual(stdout.getvalue(), "ERROR: boom\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
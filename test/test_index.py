@@ -0,0 +1,138 @@
+# Standard libs:
+import os
+import mock
+import time
+import tempfile
+import unittest
+from io import StringIO
+
+# Our libs:
+from src import index
+
+
+# Globals:
+T0 = time.mktime((2026, 10, 17, 14, 0, 0, 0, 0, -1))
+
+
+# Functions:
+def line(seconds, level, message):
+    return "{t} [{l}] {m}\n".format(t=time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(T0 + seconds)),
+                                    l=level, m=message)
+
+
+# Classes:
+class TestIndex(unittest.TestCase):
+    """Test index building, and querying through it."""
+
+    # Setup and teardown:
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "test.log")
+        with open(self.path, "w") as f:
+            for i in range(600):  # one record per second, an error every minute
+                f.write(line(i, "ERROR" if i % 60 == 30 else "INFO", "message {i}".format(i=i)))
+            f.write("Traceback (most recent call last):\n  more lines\n")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    # Tests:
+    def test_update(self):
+        # Run:
+        entries = index.update(self.path, bucket=10)
+
+        # Assert:
+        self.assertEqual(entries, 60)
+        self.assertTrue(os.path.isfile(index.index_path(self.path)))
+
+    def test_search_time_range(self):
+        # Prepare:
+        index.update(self.path, bucket=10)
+
+        # Run:
+        records = list(index.search(self.path, start=T0 + 95, end=T0 + 125))
+
+        # Assert:
+        self.assertEqual([r[3].split()[-1] for r in records], [str(i) for i in range(95, 125)])
+        self.assertEqual(records[0][1], T0 + 95)
+        self.assertEqual(records[0][2], "INFO")
+
+    def test_search_level(self):
+        # Run (the index is built on the way):
+        records = list(index.search(self.path, levels=["error"]))
+
+        # Assert:
+        self.assertEqual([r[3].split()[-1] for r in records], [str(i) for i in range(30, 600, 60)])
+
+    def test_search_multiline(self):
+        # Run:
+        records = list(index.search(self.path, start=T0 + 599))
+
+        # Assert:
+        self.assertEqual(len(records), 1)
+        self.assertTrue(records[0][3].endswith("message 599\nTraceback (most recent call last):\n  more lines"))
+
+    def test_incremental_update(self):
+        # Prepare:
+        index.update(self.path, bucket=10)
+        with open(self.path, "a") as f:
+            f.write(line(600, "WARNING", "appended"))
+            f.write(line(601, "INFO", "incomplete"))
+            f.write(line(700, "ERROR", "not yet indexed")[:-1])  # no newline yet
+
+        # Run:
+        finditer = index.RECORD_LINE.finditer
+        with mock.patch("src.index.RECORD_LINE") as record_line:
+            record_line.finditer.side_effect = finditer
+            entries = index.update(self.path, bucket=10)
+
+        # Assert:
+        self.assertEqual(entries, 61)
+        self.assertGreater(record_line.finditer.call_args[0][1], 0)  # only the appended bytes read
+        found = list(index.search(self.path, start=T0 + 600, refresh=False))
+        self.assertEqual([r[3].split()[-1] for r in found], ["appended", "incomplete"])
+
+    def test_rebuild_on_shrink(self):
+        # Prepare:
+        index.update(self.path, bucket=10)
+        with open(self.path, "w") as f:
+            f.write(line(0, "INFO", "rotated"))
+
+        # Run:
+        entries = index.update(self.path, bucket=10)
+
+        # Assert:
+        self.assertEqual(entries, 1)
+        self.assertEqual([r[3] for r in index.search(self.path)], [line(0, "INFO", "rotated")[:-1]])
+
+    def test_rebuild_on_rotation(self):
+        # Prepare (the new file is bigger than the one indexed):
+        index.update(self.path, bucket=10)
+        with open(self.path, "w") as f:
+            for i in range(1000, 1700):
+                f.write(line(i, "INFO", "new {i}".format(i=i)))
+
+        # Run:
+        records = list(index.search(self.path, start=T0 + 1100, end=T0 + 1180))
+
+        # Assert:
+        self.assertEqual([r[3].split()[-1] for r in records], [str(i) for i in range(1100, 1180)])
+
+    def test_main(self):
+        # Prepare:
+        start = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(T0 + 60))
+        end = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(T0 + 180))
+
+        # Run:
+        with mock.patch("sys.stdout", new_callable=StringIO) as stdout:
+            index.main(["update", self.path, "--bucket", "30"])
+            index.main(["query", self.path, "-s", start, "-e", end, "-l", "ERROR"])
+
+        # Assert:
+        lines = stdout.getvalue().splitlines()
+        self.assertIn("20 entries", lines[0])
+        self.assertEqual(lines[1:], [line(90, "ERROR", "message 90")[:-1], line(150, "ERROR", "message 150")[:-1]])
+
+
+if __name__ == "__main__":
+    unittest.main()
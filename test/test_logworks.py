@@ -1,8 +1,20 @@
 # Standard libs:
+import gc
+import io
 import os
+import sys
+import copy
 import mock
+import pickle
 import logging
 import unittest
+import tempfile
+import threading
+import time
+import subprocess
+import gzip
+import lzma
+import json
 from io import StringIO
 
 # Our libs:
@@ -66,12 +78,10 @@ class TestLogger(unittest.TestCase):
         # Prepare:
         logger = self.logger
         logger.logger.info = mock.Mock()
-        logger.with_info_color = mock.Mock()
 
         for text in self.TEXTS:
             # Prepare:
             logger.logger.info.reset_mock()
-            logger.with_info_color.reset_mock()
 
             # Run:
             logger.info(text)
@@ -79,18 +89,16 @@ class TestLogger(unittest.TestCase):
             # Assert:
             logger.logger.info.assert_called_once()
             self.assertIn(text, logger.logger.info.call_args[0])
-            logger.with_info_color.assert_called_once()
+            self.assertEqual(logger.logger.info.call_args[1]["extra"]["clevelname"], logger.with_info_color("[INFO]"))
 
     def test_warning(self):
         # Prepare:
         logger = self.logger
         logger.logger.warning = mock.Mock()
-        logger.with_warning_color = mock.Mock()
 
         for text in self.TEXTS:
             # Prepare:
             logger.logger.warning.reset_mock()
-            logger.with_warning_color.reset_mock()
 
             # Run:
             logger.warning(text)
@@ -98,18 +106,16 @@ class TestLogger(unittest.TestCase):
             # Assert:
             logger.logger.warning.assert_called_once()
             self.assertIn(text, logger.logger.warning.call_args[0])
-            logger.with_warning_color.assert_called_once()
+            self.assertEqual(logger.logger.warning.call_args[1]["extra"]["clevelname"], logger.with_warning_color("[WARNING]"))
 
     def test_error(self):
         # Prepare:
         logger = self.logger
         logger.logger.error = mock.Mock()
-        logger.with_error_color = mock.Mock()
 
         for text in self.TEXTS:
             # Prepare:
             logger.logger.error.reset_mock()
-            logger.with_error_color.reset_mock()
 
             # Run:
             logger.error(text)
@@ -117,18 +123,17 @@ class TestLogger(unittest.TestCase):
             # Assert:
             logger.logger.error.assert_called_once()
             self.assertIn(text, logger.logger.error.call_args[0])
-            logger.with_error_color.assert_called_once()
+            self.assertEqual(logger.logger.error.call_args[1]["extra"]["clevelname"], logger.with_error_color("[ERROR]"))
 
     def test_debug(self):
         # Prepare:
-        logger = self.logger
+        with mock.patch("sys.stdout"), mock.patch("sys.stderr"):
+            logger = logworks.Logger(level=logging.DEBUG)
         logger.logger.debug = mock.Mock()
-        logger.with_debug_color = mock.Mock()
 
         for text in self.TEXTS:
             # Prepare:
             logger.logger.debug.reset_mock()
-            logger.with_debug_color.reset_mock()
 
             # Run:
             logger.debug(text)
@@ -136,18 +141,16 @@ class TestLogger(unittest.TestCase):
             # Assert:
             logger.logger.debug.assert_called_once()
             self.assertIn(text, logger.logger.debug.call_args[0])
-            logger.with_debug_color.assert_called_once()
+            self.assertEqual(logger.logger.debug.call_args[1]["extra"]["clevelname"], logger.with_debug_color("[DEBUG]"))
 
     def test_ok(self):
         # Prepare:
         logger = self.logger
         logger.logger.info = mock.Mock()  # yes, "info". This is correct.
-        logger.with_ok_color = mock.Mock()
 
         for text in self.TEXTS:
             # Prepare:
             logger.logger.info.reset_mock()
-            logger.with_ok_color.reset_mock()
 
             # Run:
             logger.ok(text)
@@ -155,7 +158,101 @@ class TestLogger(unittest.TestCase):
             # Assert:
             logger.logger.info.assert_called_once()
             self.assertIn(text, logger.logger.info.call_args[0])
-            logger.with_ok_color.assert_called_once()
+            self.assertEqual(logger.logger.info.call_args[1]["extra"]["clevelname"], logger.with_ok_color("[OK]"))
+
+    def test_disabled_level_short_circuits(self):
+        # Prepare:
+        logger = self.logger  # level is INFO
+        logger.logger.debug = mock.Mock()
+        func = mock.Mock(return_value="expensive")
+
+        # Run:
+        logger.debug(func)
+        logger.debug("%s", func)
+
+        # Assert:
+        logger.logger.debug.assert_not_called()
+        func.assert_not_called()
+
+    def test_args_are_passed_along(self):
+        # Prepare:
+        logger = self.logger
+        logger.logger.info = mock.Mock()
+
+        # Run:
+        logger.info("%s and %d", "this", 3)
+
+        # Assert:
+        self.assertEqual(logger.logger.info.call_args[0], ("%s and %d", "this", 3))
+
+    def test_callable_text(self):
+        # Prepare:
+        logger = self.logger
+        logger.logger.info = mock.Mock()
+        func = mock.Mock(return_value="expensive")
+
+        # Run:
+        logger.info(func)
+        message = logger.logger.info.call_args[0][0]
+
+        # Assert:
+        func.assert_not_called()
+        self.assertEqual(str(message), "expensive")
+        self.assertEqual(str(message), "expensive")
+        func.assert_called_once_with()
+
+    def test_lazy_args_are_formatted_when_emitted(self):
+        # Prepare:
+        stream = StringIO()
+        with mock.patch("sys.stderr", stream):
+            logger = logworks.ConsoleLogger(
+                which_logger="test_lazy_args_are_formatted_when_emitted",
+                console_formatter=logworks.get_formatter(format="{message}"),
+            )
+
+        # Run:
+        logger.info("%s = %d", "answer", 42)
+        logger.ok(lambda: "computed")
+
+        # Assert:
+        self.assertEqual(stream.getvalue(), "answer = 42\ncomputed\n")
+
+    # Test levels:
+    def test_disabled_levels_are_noop(self):
+        # Prepare:
+        logger = self.logger  # level is INFO
+
+        # Assert:
+        self.assertIs(logger.debug, logworks._noop)
+        for which in ("info", "ok", "warning", "error"):
+            self.assertNotIn(which, logger.__dict__)
+
+    def test_set_level(self):
+        # Prepare:
+        logger = self.logger
+
+        # Run:
+        logger.set_level(logging.ERROR)
+        disabled = [logger.debug, logger.info, logger.ok, logger.warning]
+        logger.set_level(logging.DEBUG)
+
+        # Assert:
+        self.assertEqual(disabled, [logworks._noop] * 4)
+        self.assertIsNot(logger.error, logworks._noop)
+        for which in ("debug", "info", "ok", "warning"):
+            self.assertIsNot(getattr(logger, which), logworks._noop)
+        self.assertEqual(logger.console_handler.level, logging.DEBUG)
+
+    def test_set_level_rebinds_sharing_loggers(self):
+        # Prepare:
+        with mock.patch("sys.stdout"), mock.patch("sys.stderr"):
+            other = logworks.Logger()
+
+        # Run:
+        other.set_level(logging.DEBUG)
+
+        # Assert:
+        self.assertIsNot(self.logger.debug, logworks._noop)
 
     # Test colorizers:
     def test_with_name_color(self):
@@ -294,6 +391,45 @@ class TestLogger(unittest.TestCase):
             # Assert:
             self.assertEqual(ret, text)
 
+    # Test level tags:
+    def test_tags(self):
+        # Prepare:
+        logger = self.logger
+
+        # Run:
+        for which, tag in logworks.LEVEL_TAGS:
+            # Assert:
+            self.assertEqual(logger.tags[which], logger._colorize_as(tag, which))
+            self.assertIn(tag, logger.tags[which])
+            self.assertNotEqual(logger.tags[which], tag)
+
+    def test_tags_are_read_only(self):
+        # Assert:
+        with self.assertRaises(TypeError):
+            self.logger.tags["info"] = "[whatever]"
+
+    def test_tags_rebuilt_on_no_color(self):
+        # Prepare:
+        logger = self.logger
+
+        # Run:
+        logger.no_color = True
+
+        # Assert:
+        for which, tag in logworks.LEVEL_TAGS:
+            self.assertEqual(logger.tags[which], tag)
+
+    def test_tags_rebuilt_on_conf(self):
+        # Prepare:
+        logger = self.logger
+
+        # Run:
+        logger.conf = {"colorize": True, "colors": self.COLORS}
+
+        # Assert:
+        self.assertEqual(logger.tags["info"], logworks.Logger.colorize("[INFO]", self.COLORS["info"]))
+        self.assertEqual(logger.tags["ok"], logworks.Logger.colorize("[OK]", 0))
+
     # Test other:
     def test_use_colors_no_conf(self):
         # Prepare:
@@ -353,10 +489,166 @@ class TestLogger(unittest.TestCase):
         with mock.patch("sys.stdout"):
             # Run:
             ret = logworks.Logger.read_conf("file_which_does_not_exist")
-            
+
         # Assert:
         self.assertEqual(ret, {})
 
+    def test_read_conf_shared(self):
+        # Prepare:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fn = os.path.join(tmpdir, "conf.json")
+            with open(fn, "w") as f:
+                json.dump({"colorize": False}, f)
+
+            # Run:
+            with mock.patch("json.load", wraps=json.load) as mock_load:
+                first = logworks.Logger(conf_fn=fn, which_logger="TestReadConfShared1", file_output=False)
+                second = logworks.Logger(conf_fn=fn, which_logger="TestReadConfShared2", file_output=False)
+
+            # Assert:
+            self.assertIs(first.conf, second.conf)
+            self.assertEqual(mock_load.call_count, 1)
+
+            # Clean:
+            first.close()
+            second.close()
+
+    def test_read_conf_read_only(self):
+        # Prepare:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fn = os.path.join(tmpdir, "conf.json")
+            with open(fn, "w") as f:
+                json.dump({"colors": {"info": 34}, "list": [1, {"a": 2}]}, f)
+
+            # Run:
+            conf = logworks.Logger.read_conf(fn)
+
+            # Assert:
+            with self.assertRaises(TypeError):
+                conf["colorize"] = False
+            with self.assertRaises(TypeError):
+                conf["colors"]["info"] = 35
+            with self.assertRaises(TypeError):
+                conf["list"][1]["a"] = 3
+            self.assertEqual(logworks.Logger.read_conf(fn)["colors"], {"info": 34})
+
+    def test_hot_reload(self):
+        # Prepare:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fn = os.path.join(tmpdir, "conf.json")
+            with open(fn, "w") as f:
+                json.dump({"colorize": True}, f)
+            logger = logworks.Logger(conf_fn=fn, which_logger="TestHotReload", file_output=False,
+                                     hot_reload=True)
+            info_tag = logger.tags["info"]
+
+            with open(fn, "w") as f:
+                json.dump({"colorize": True, "colors": {"info": 35}, "level": "warning"}, f)
+            stat = os.stat(fn)
+            os.utime(fn, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+
+            # Run:
+            logworks.check_confs()
+
+            # Assert:
+            self.assertNotEqual(logger.tags["info"], info_tag)
+            self.assertIn("35", logger.tags["info"])
+            self.assertEqual(logger.logger.level, logging.WARNING)
+            self.assertEqual(logworks.Logger.read_conf(fn), logger.conf)
+
+            # Clean:
+            logger.close()
+
+    def test_conf_level(self):
+        # Prepare:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fn = os.path.join(tmpdir, "conf.json")
+            with open(fn, "w") as f:
+                json.dump({"level": "error"}, f)
+
+            # Run:
+            from_conf = logworks.Logger(conf_fn=fn, which_logger="TestConfLevel1", file_output=False)
+            given = logworks.Logger(conf_fn=fn, which_logger="TestConfLevel2", file_output=False, level="debug")
+            file_logger = logworks.FileLogger(logfile=os.path.join(tmpdir, "test.log"), which_logger="TestConfLevel3")
+
+            # Assert:
+            self.assertEqual(from_conf.logger.level, logging.ERROR)
+            self.assertEqual(given.logger.level, logging.DEBUG)
+            self.assertEqual(file_logger.logger.level, logging.DEBUG)
+
+            # Clean:
+            for logger in (from_conf, given, file_logger):
+                logger.close()
+
+    def test_hot_reload_invalid(self):
+        # Prepare:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fn = os.path.join(tmpdir, "conf.json")
+            with open(fn, "w") as f:
+                json.dump({"colorize": True}, f)
+            first = logworks.Logger(conf_fn=fn, which_logger="TestHotReloadInvalid1", file_output=False,
+                                    hot_reload=True)
+            second = logworks.Logger(conf_fn=fn, which_logger="TestHotReloadInvalid2", file_output=False,
+                                     hot_reload=True)
+            conf = first.conf
+
+            for i, content in enumerate(([], {"level": "verbose"}, {"level": 10.5}, {"level": "error"})):
+                with open(fn, "w") as f:
+                    json.dump(content, f)
+                stat = os.stat(fn)
+                os.utime(fn, ns=(stat.st_atime_ns, stat.st_mtime_ns + (i + 1) * 1000000000))
+
+                # Run:
+                with mock.patch.object(first, "apply_conf", side_effect=RuntimeError("boom")):
+                    logworks.check_confs()
+
+                # Assert:
+                if i < 3:  # invalid, ignored
+                    self.assertIs(second.conf, conf)
+                else:  # valid, applied even if another Logger() fails to
+                    self.assertEqual(second.logger.level, logging.ERROR)
+
+            # Clean:
+            first.close()
+            second.close()
+
+    def test_hot_reload_registers_when_built(self):
+        # Prepare:
+        def watch_conf(path, logger):
+            logger.apply_conf({"level": "error"})  # as a watcher tick would
+
+        # Run:
+        with mock.patch("src.logworks._watch_conf", side_effect=watch_conf) as watch, mock.patch("sys.stdout"):
+            logger = logworks.Logger(conf_fn="whatever", which_logger="TestHotReloadBuilt", file_output=False,
+                                     console_output=False, hot_reload=True)
+
+        # Assert:
+        watch.assert_called_once_with("whatever", logger)
+        self.assertEqual(logger.logger.level, logging.ERROR)
+
+        # Clean:
+        logger.close()
+
+    def test_watcher_survives(self):
+        # Prepare:
+        with mock.patch("time.sleep", side_effect=[None, None, SystemExit]), \
+             mock.patch("src.logworks.check_confs", side_effect=[RuntimeError("boom"), None]) as check:
+            # Run:
+            with self.assertRaises(SystemExit):
+                logworks._keep_checking_confs()
+
+        # Assert:
+        self.assertEqual(check.call_count, 2)
+
+    def test_level_number(self):
+        # Assert:
+        self.assertEqual(logworks.level_number(logging.ERROR), logging.ERROR)
+        self.assertEqual(logworks.level_number("ok"), logging.INFO)
+        self.assertEqual(logworks.level_number("DEBUG"), logging.DEBUG)
+        self.assertEqual(logworks.level_number("critical"), logging.CRITICAL)
+        with self.assertRaises(ValueError):
+            logworks.level_number("loud")
+
 
 class TestConsoleLogger(unittest.TestCase):
     """Test ConsoleLogger() class."""
@@ -459,54 +751,1427 @@ class TestFileLogger(unittest.TestCase):
         self.assertIsInstance(logger.logger, logging.Logger)
 
 
-class TestMain(unittest.TestCase):
-    """Test stuff outside Logger() class."""
+class TestHandlerRegistry(unittest.TestCase):
+    """Test that Logger() instances share their handlers."""
 
     # Setup and teardown:
     def setUp(self):
-        pass
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.logfile = os.path.join(self.tmpdir.name, "shared.log")
+        self.stream = StringIO()
 
     def tearDown(self):
-        if os.path.isfile("logworks.log"):
-            os.unlink("logworks.log")
+        self.tmpdir.cleanup()
 
-    # Test version:
-    @unittest.skip("is this test impossible?")
-    def test_version_ok(self):
-        self.assertIsInstance(logworks.__version__, str)
+    # Helper methods:
+    def make_logger(self, name="TestHandlerRegistry", **kwargs):
+        with mock.patch("sys.stderr", self.stream):
+            return logworks.Logger(which_logger=name, logfile=self.logfile, **kwargs)
 
-    def test_version_ko(self):
+    # Tests:
+    def test_same_logger_reuses_handlers(self):
         # Prepare:
-        import importlib
-        import pkg_resources
-        
+        loggers = [self.make_logger() for _ in range(5)]
+
         # Run:
-        with mock.patch("pkg_resources.get_distribution", side_effect=pkg_resources.DistributionNotFound):
-            importlib.reload(logworks)
-        
+        loggers[0].info("once")
+        loggers[0].flush()
+
         # Assert:
-        self.assertIsNone(logworks.__version__)
+        self.assertEqual(len(loggers[0].logger.handlers), 2)
+        for logger in loggers[1:]:
+            self.assertEqual(logger.handlers, loggers[0].handlers)
+        self.assertEqual(self.stream.getvalue().count("once"), 1)
+        with open(self.logfile) as f:
+            self.assertEqual(f.read().count("once"), 1)
 
         # Clean:
-        importlib.reload(logworks)
+        for logger in loggers:
+            logger.close()
+
+    def test_different_formatter_different_handler(self):
+        # Prepare:
+        one = self.make_logger()
+        other = self.make_logger(console_formatter=logworks.get_formatter())
+
+        # Assert:
+        self.assertIs(one.handlers[1], other.handlers[1])
+        self.assertIsNot(one.handlers[0], other.handlers[0])
+        self.assertEqual(len(one.logger.handlers), 3)
+
+        # Clean:
+        one.close()
+        other.close()
+
+    def test_close_releases(self):
+        # Prepare:
+        one = self.make_logger()
+        other = self.make_logger()
+        stdlib_logger = one.logger
 
-    # Other:
-    def test_get_formatter_default(self):
         # Run:
-        fmt = logworks.get_formatter()
+        one.close()
+        handlers_after_one = list(stdlib_logger.handlers)
+        other.close()
 
         # Assert:
-        self.assertIsInstance(fmt, logging.Formatter)
+        self.assertEqual(len(handlers_after_one), 2)
+        self.assertEqual(stdlib_logger.handlers, [])
 
-    @unittest.skip("right now, this is useless")
-    def test_get_formatter_custom_format(self):
-        # We use a specific name for logger, to override logger(s) generated in previous tests:
-        fmt = logworks.get_formatter(format='{clevelname} - {message}')
-        logger = logworks.ConsoleLogger(
-            which_logger="test_get_formatter_custom_format",
-            console_formatter=fmt,
+    def test_garbage_collection_releases(self):
+        # Prepare:
+        logger = self.make_logger()
+        stdlib_logger = logger.logger
+
+        # Run:
+        del logger
+
+        # Assert:
+        self.assertEqual(stdlib_logger.handlers, [])
+
+
+class TestSharedFile(unittest.TestCase):
+    """Test that FileLogger() instances writing to the same file share it."""
+
+    # Setup and teardown:
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.logfile = os.path.join(self.tmpdir.name, "pooled.log")
+        self.loggers = [
+            logworks.FileLogger(logfile=self.logfile, which_logger="TestSharedFile{i}".format(i=i))
+            for i in range(3)
+        ]
+
+    def tearDown(self):
+        for logger in self.loggers:
+            logger.close()
+        self.tmpdir.cleanup()
+
+    # Tests:
+    def test_single_shared_file(self):
+        # Run:
+        files = [logger.handlers[0].file for logger in self.loggers]
+
+        # Assert:
+        for shared in files:
+            self.assertIs(shared, files[0])
+        self.assertEqual(files[0].users, 3)
+
+    def test_opened_lazily(self):
+        # Assert:
+        self.assertFalse(self.loggers[0].handlers[0].file.is_open)
+        self.assertFalse(os.path.exists(self.logfile))
+
+    def test_all_write(self):
+        # Run:
+        for i, logger in enumerate(self.loggers):
+            logger.info("from %d", i)
+
+        # Assert:
+        with open(self.logfile) as f:
+            lines = f.read().splitlines()
+        self.assertEqual([line.split("] ")[1] for line in lines], ["from 0", "from 1", "from 2"])
+
+    def test_closed_when_unused(self):
+        # Prepare:
+        self.loggers[0].info("open it")
+        shared = self.loggers[0].handlers[0].file
+
+        # Run:
+        for logger in self.loggers:
+            logger.close()
+
+        # Assert:
+        self.assertFalse(shared.is_open)
+        self.assertNotIn(self.logfile, logworks._FILES)
+
+
+class TestBufferedFileLogger(unittest.TestCase):
+    """Test FileLogger(buffered=True)."""
+
+    # Setup and teardown:
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.logfile = os.path.join(self.tmpdir.name, "buffered.log")
+        self.logger = logworks.FileLogger(
+            logfile=self.logfile,
+            which_logger="TestBufferedFileLogger",
+            file_formatter=logworks.get_formatter(format="{message}"),
+            buffered=True,
+            buffer_size=20,
+            flush_interval=60,
         )
-        ###logger.info("post")
+        self.handler = self.logger.file_handler
+
+    def tearDown(self):
+        self.logger.close()
+        self.tmpdir.cleanup()
+
+    # Helper methods:
+    def read(self):
+        if not os.path.exists(self.logfile):
+            return ""
+
+        with open(self.logfile) as f:
+            return f.read()
+
+    # Tests:
+    def test_constructor(self):
+        self.assertIsInstance(self.handler, logworks.BufferedFileHandler)
+
+    def test_buffered_until_size(self):
+        # Run:
+        self.logger.info("123456789")  # 10 characters, with newline
+        before = self.read()
+        self.logger.info("123456789")
 
         # Assert:
-        self.assertIsInstance(fmt, logging.Formatter)
+        self.assertEqual(before, "")
+        self.assertEqual(self.read(), "123456789\n" * 2)
+        self.assertEqual(self.handler.flushes, 1)
+        self.assertEqual(self.handler.bytes_written, 20)
+
+    def test_warning_flushes(self):
+        # Run:
+        self.logger.info("a")
+        self.logger.warning("b")
+
+        # Assert:
+        self.assertEqual(self.read(), "a\nb\n")
+        self.assertEqual(self.handler.flushes, 1)
+
+    def test_error_flushes(self):
+        # Run:
+        self.logger.debug("a")
+        self.logger.error("b")
+
+        # Assert:
+        self.assertEqual(self.read(), "a\nb\n")
+
+    def test_flush_on_close(self):
+        # Run:
+        self.logger.info("a")
+        self.logger.close()
+
+        # Assert:
+        self.assertEqual(self.read(), "a\n")
+
+    def test_flush_interval(self):
+        # Prepare:
+        self.handler.flush_interval = 0.05
+
+        # Run:
+        self.logger.info("a")
+        timer = self.handler._timer
+        timer.join()
+
+        # Assert:
+        self.assertEqual(self.read(), "a\n")
+        self.assertIsNone(self.handler._timer)
+
+
+class TestMemoryLogger(unittest.TestCase):
+    """Test MemoryLogger() class, and RingHandler() behind it."""
+
+    # Setup and teardown:
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.dumpfile = os.path.join(self.tmpdir.name, "dump.log")
+        self.logger = logworks.MemoryLogger(capture=3, which_logger="TestMemoryLogger")
+
+    def tearDown(self):
+        self.logger.close()
+        self.tmpdir.cleanup()
+
+    # Tests:
+    def test_constructor(self):
+        # Run:
+        logger = self.logger
+
+        # Assert:
+        self.assertIsInstance(logger.capture_handler, logworks.RingHandler)
+        self.assertIsNone(logger.console_handler)
+        self.assertIsNone(logger.file_handler)
+        self.assertEqual(logger.captured(), [])
+
+    def test_capture(self):
+        # Run:
+        self.logger.debug("one %d", 1)
+        self.logger.ok("two")
+
+        # Assert:
+        captured = self.logger.captured()
+        self.assertEqual([r.message for r in captured], ["one 1", "two"])
+        self.assertEqual([r.level for r in captured], ["debug", "ok"])
+        self.assertEqual([r.levelno for r in captured], [logging.DEBUG, logging.INFO])
+        self.assertEqual(captured[0].msg, "one %d")  # kept unformatted
+
+    def test_ring_keeps_latest(self):
+        # Run:
+        for i in range(5):
+            self.logger.info("msg %d", i)
+
+        # Assert:
+        self.assertEqual([r.message for r in self.logger.captured()], ["msg 2", "msg 3", "msg 4"])
+
+    def test_query(self):
+        # Prepare:
+        self.logger.info("apple")
+        self.logger.ok("banana")
+        self.logger.warning("apricot")
+
+        # Assert:
+        self.assertEqual([r.message for r in self.logger.captured(level="ok")], ["banana"])
+        self.assertEqual([r.message for r in self.logger.captured(level=logging.WARNING)], ["apricot"])
+        self.assertEqual([r.message for r in self.logger.captured(contains="ap")], ["apple", "apricot"])
+        self.assertEqual(self.logger.captured(level="info", contains="nope"), [])
+
+    def test_captured_records_are_copies(self):
+        # Prepare:
+        self.logger.info("first")
+        captured = self.logger.captured()
+
+        # Run:
+        for i in range(3):
+            self.logger.info("other")
+
+        # Assert:
+        self.assertEqual(captured[0].message, "first")
+
+    def test_clear(self):
+        # Prepare:
+        self.logger.info("something")
+
+        # Run:
+        self.logger.capture_handler.clear()
+
+        # Assert:
+        self.assertEqual(self.logger.captured(), [])
+
+    def test_dump_on_error(self):
+        # Prepare:
+        logger = logworks.MemoryLogger(capture=10, dump_to=self.dumpfile, which_logger="test_dump_on_error")
+
+        # Run:
+        logger.debug("context")
+        exists_before = os.path.exists(self.dumpfile)
+        logger.error("failure")
+
+        # Assert:
+        self.assertFalse(exists_before)
+        with open(self.dumpfile) as f:
+            lines = f.read().splitlines()
+        self.assertEqual([line.split(" ", 2)[2] for line in lines], ["[DEBUG] context", "[ERROR] failure"])
+
+        # Clean:
+        logger.close()
+
+    def test_dump_only_new_records(self):
+        # Prepare:
+        logger = logworks.MemoryLogger(capture=10, dump_to=self.dumpfile, which_logger="test_dump_only_new_records")
+
+        # Run:
+        logger.debug("context")
+        logger.error("first failure")
+        logger.error("second failure")
+        logger.debug("more context")
+        logger.error("third failure")
+
+        # Assert:
+        with open(self.dumpfile) as f:
+            lines = f.read().splitlines()
+        self.assertEqual([line.split(" ", 2)[2] for line in lines], [
+            "[DEBUG] context", "[ERROR] first failure",
+            "[ERROR] second failure",
+            "[DEBUG] more context", "[ERROR] third failure",
+        ])
+
+        # Clean:
+        logger.close()
+
+    def test_dump_only_new_records_wrapped(self):
+        # Prepare:
+        logger = logworks.MemoryLogger(capture=3, dump_to=self.dumpfile, which_logger="test_dump_wrapped")
+
+        # Run:
+        for i in range(5):
+            logger.debug("context {i}".format(i=i))
+        logger.error("failure")
+
+        # Assert:
+        with open(self.dumpfile) as f:
+            lines = f.read().splitlines()
+        self.assertEqual([line.split(" ", 2)[2] for line in lines], [
+            "[DEBUG] context 3", "[DEBUG] context 4", "[ERROR] failure",
+        ])
+
+        # Clean:
+        logger.close()
+
+    def test_logger_capture_option(self):
+        # Run:
+        with mock.patch("sys.stderr"):
+            logger = logworks.Logger(which_logger="test_logger_capture_option", file_output=False, capture=5)
+        logger.warning("kept")
+
+        # Assert:
+        self.assertEqual([r.message for r in logger.captured()], ["kept"])
+
+        # Clean:
+        logger.close()
+
+
+class TestRotation(unittest.TestCase):
+    """Test rotation of log files."""
+
+    # Setup and teardown:
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.logfile = os.path.join(self.tmpdir.name, "rotated.log")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    # Helper methods:
+    def make_logger(self, **rotation):
+        return logworks.FileLogger(
+            logfile=self.logfile,
+            which_logger="TestRotation",
+            file_formatter=logworks.get_formatter(format="{message}"),
+            rotation=rotation,
+        )
+
+    @staticmethod
+    def wait_for_compressor():
+        for thread in threading.enumerate():
+            if thread.name == "logworks-compressor":
+                thread.join()
+
+    def read(self, path):
+        opener = {".gz": gzip.open, ".xz": lzma.open}.get(os.path.splitext(path)[1], open)
+        with opener(path, "rt") as f:
+            return f.read()
+
+    # Tests:
+    def test_rotate_by_size(self):
+        # Prepare:
+        logger = self.make_logger(max_bytes=10)
+
+        # Run:
+        for text in ("1234", "5678", "abcd"):
+            logger.info(text)
+        self.wait_for_compressor()
+
+        # Assert:
+        segments = logworks.rolled_segments(self.logfile)
+        self.assertEqual(len(segments), 1)
+        self.assertEqual(self.read(segments[0]), "1234\n5678\n")
+        self.assertEqual(self.read(self.logfile), "abcd\n")
+        self.assertEqual(logger.file_handler.file.rotations, 1)
+
+        # Clean:
+        logger.close()
+
+    def test_rotate_by_time(self):
+        # Prepare:
+        logger = self.make_logger(interval=3600)
+        logger.info("old")
+
+        # Run:
+        logger.file_handler.file._rollover_at = time.time() - 1
+        logger.info("new")
+
+        # Assert:
+        segments = logworks.rolled_segments(self.logfile)
+        self.assertEqual([self.read(s) for s in segments], ["old\n"])
+        self.assertEqual(self.read(self.logfile), "new\n")
+
+        # Clean:
+        logger.close()
+
+    def test_compress_and_retention(self):
+        for compress, extension in (("gzip", ".gz"), ("lzma", ".xz")):
+            # Prepare:
+            logger = self.make_logger(max_bytes=1, compress=compress, backup_count=2)
+
+            # Run:
+            for i in range(5):
+                logger.info("line %d", i)
+                self.wait_for_compressor()
+
+            # Assert:
+            segments = logworks.rolled_segments(self.logfile)
+            self.assertEqual(len(segments), 2)
+            self.assertTrue(all(s.endswith(extension) for s in segments))
+            self.assertEqual([self.read(s) for s in segments], ["line 2\n", "line 3\n"])
+            self.assertEqual(self.read(self.logfile), "line 4\n")
+
+            # Clean:
+            logger.close()
+            for segment in segments:
+                os.unlink(segment)
+            os.unlink(self.logfile)
+
+    def test_rotation_from_conf(self):
+        # Prepare:
+        conf_fn = os.path.join(self.tmpdir.name, "conf.json")
+        with open(conf_fn, "w") as f:
+            json.dump({"logfile": self.logfile, "rotation": {"max_bytes": 100, "compress": "gzip"}}, f)
+
+        # Run:
+        logger = logworks.FileLogger(conf_fn=conf_fn, which_logger="test_rotation_from_conf")
+
+        # Assert:
+        self.assertEqual(logger.file_handler.file.max_bytes, 100)
+        self.assertEqual(logger.file_handler.file.compress, "gzip")
+
+        # Clean:
+        logger.close()
+
+    def test_bad_compression(self):
+        with self.assertRaises(ValueError):
+            logworks.SharedFile(self.logfile, rotation={"compress": "zip"})
+
+
+class TestTimed(unittest.TestCase):
+    """Test Logger.timed(), and Timed() behind it."""
+
+    # Setup and teardown:
+    def setUp(self):
+        self.logger = logworks.MemoryLogger(capture=100, which_logger="TestTimed")
+
+    def tearDown(self):
+        self.logger.close()
+
+    # Tests:
+    def test_context_manager(self):
+        # Run:
+        with self.logger.timed("block"):
+            pass
+
+        # Assert:
+        captured = self.logger.captured()
+        self.assertEqual(len(captured), 1)
+        self.assertEqual(captured[0].level, "ok")
+        self.assertRegex(captured[0].message, r"^block took \d+\.\d{3} ms$")
+
+    def test_decorator(self):
+        # Prepare:
+        @self.logger.timed("work", level="debug")
+        def work(x):
+            return x * 2
+
+        # Run:
+        ret = [work(1), work(2)]
+
+        # Assert:
+        self.assertEqual(ret, [2, 4])
+        self.assertEqual([r.level for r in self.logger.captured()], ["debug", "debug"])
+
+    def test_exception(self):
+        # Run:
+        with self.assertRaises(KeyError):
+            with self.logger.timed("failing"):
+                raise KeyError("x")
+
+        # Assert:
+        captured = self.logger.captured()
+        self.assertEqual(captured[0].level, "error")
+        self.assertRegex(captured[0].message, r"^failing failed after \d+\.\d{3} ms: KeyError")
+
+    def test_aggregate(self):
+        # Prepare:
+        timed = self.logger.timed("agg", every=3600)
+
+        # Run:
+        for _ in range(5):
+            with self.logger.timed("agg", every=3600):
+                pass
+
+        # Assert:
+        self.assertEqual(self.logger.captured(), [])
+        self.assertEqual(timed.timing.count, 5)
+
+        # Run:
+        self.logger.close()
+
+        # Assert:
+        captured = self.logger.captured()
+        self.assertEqual(len(captured), 1)
+        self.assertRegex(captured[0].message, r"^agg: 5 calls in \d+\.\d s, min/mean/max ")
+
+    def test_aggregate_due(self):
+        # Prepare:
+        timed = self.logger.timed("due", every=0)
+
+        # Run:
+        with timed:
+            pass
+        with timed:
+            pass
+
+        # Assert:
+        self.assertEqual(len(self.logger.captured(contains="due: 1 calls")), 2)
+        self.assertEqual(timed.timing.take(), None)
+
+    def test_level_number(self):
+        # Run:
+        with self.logger.timed("info", level=logging.INFO):
+            pass
+        with self.logger.timed("critical", level=logging.CRITICAL):
+            pass
+        with self.logger.timed("warning", level="WARNING"):
+            pass
+
+        # Assert:
+        self.assertEqual([r.level for r in self.logger.captured()], ["info", "error", "warning"])
+
+    def test_bad_level(self):
+        for level in ("bogus", logging.NOTSET, None):
+            with self.assertRaises(ValueError):
+                self.logger.timed("block", level=level)
+
+    def test_aggregate_per_level(self):
+        # Run:
+        for level in ("debug", "warning", "debug"):
+            with self.logger.timed("agg", level=level, every=3600):
+                pass
+        self.logger.close()
+
+        # Assert:
+        self.assertEqual([(r.level, r.message.split(",")[0]) for r in self.logger.captured()], [
+            ("debug", "agg: 2 calls in 0.0 s"), ("warning", "agg: 1 calls in 0.0 s"),
+        ])
+
+
+class TestRateLimit(unittest.TestCase):
+    """Test Logger(rate_limit=...), and RateLimiter() behind it."""
+
+    # Setup and teardown:
+    def setUp(self):
+        self.logger = logworks.Logger(which_logger="TestRateLimit", console_output=False, file_output=False,
+                                      capture=1000, rate_limit={"rate": 0.001, "burst": 3, "interval": 3600})
+
+    def tearDown(self):
+        self.logger.close()
+
+    # Tests:
+    def test_suppressed(self):
+        # Run:
+        for i in range(10):
+            self.logger.error("failed %d", i)
+            self.logger.info("other call site")
+
+        # Assert:
+        messages = [r.message for r in self.logger.captured()]
+        self.assertEqual(messages.count("other call site"), 3)
+        self.assertEqual([m for m in messages if m.startswith("failed")], ["failed 0", "failed 1", "failed 2"])
+
+    def test_summary_on_close(self):
+        # Prepare:
+        for _ in range(10):
+            self.logger.warning("again")
+
+        # Run:
+        self.logger.close()
+
+        # Assert:
+        summary = self.logger.captured(contains="Suppressed")
+        self.assertEqual(len(summary), 1)
+        self.assertEqual(summary[0].level, "warning")
+        self.assertRegex(summary[0].message, r"^Suppressed 7 similar messages, from .*test_logworks.py:\d+: again$")
+
+    def test_periodic_summary(self):
+        # Prepare:
+        self.logger.limiter.interval = 0
+        self.logger.limiter.take_summary()
+
+        # Run:
+        for _ in range(5):
+            self.logger.error("again")
+
+        # Assert:
+        self.assertEqual([r.message.split(",")[0] for r in self.logger.captured(contains="Suppressed")],
+                         ["Suppressed 1 similar messages", "Suppressed 1 similar messages"])
+
+    def test_lru_is_bounded(self):
+        # Prepare:
+        limiter = logworks.RateLimiter(rate=0, burst=1, max_keys=2)
+
+        # Run:
+        allowed = [limiter.allow(key) for key in ("a", "a", "b", "c", "a")]
+
+        # Assert:
+        self.assertEqual(allowed, [True, False, True, True, True])  # "a" was evicted, and starts over
+        self.assertEqual(len(limiter._buckets), 2)
+        self.assertEqual(limiter.take_summary(), [(None, 1)])
+
+    def test_disabled_by_default(self):
+        # Prepare:
+        logger = logworks.MemoryLogger(which_logger="TestRateLimitDefault")
+
+        # Assert:
+        self.assertIsNone(logger.limiter)
+        for which in ("info", "ok", "warning", "error"):
+            self.assertNotIn(which, logger.__dict__)
+
+        # Clean:
+        logger.close()
+
+    def test_enabled_with_defaults(self):
+        for rate_limit in (True, {}):
+            # Prepare:
+            logger = logworks.Logger(which_logger="TestRateLimitDefaults", console_output=False, file_output=False,
+                                     capture=10, rate_limit=rate_limit)
+
+            # Assert:
+            self.assertEqual((logger.limiter.rate, logger.limiter.burst), (1.0, 10))
+
+            # Clean:
+            logger.close()
+
+    def test_disabled_explicitly(self):
+        # Prepare:
+        logger = logworks.Logger(which_logger="TestRateLimitDisabled", console_output=False, file_output=False,
+                                 capture=10, rate_limit=False)
+
+        # Assert:
+        self.assertIsNone(logger.limiter)
+
+        # Clean:
+        logger.close()
+
+    def test_garbage_collection_releases(self):
+        # Prepare:
+        logger = logworks.Logger(which_logger="TestRateLimitGC", console_output=False, file_output=False,
+                                 capture=10, rate_limit=True)
+        stdlib_logger = logger.logger
+        gc.disable()  # only reference counting
+
+        # Run:
+        try:
+            del logger
+        finally:
+            gc.enable()
+
+        # Assert:
+        self.assertEqual(stdlib_logger.handlers, [])
+
+
+class TestBind(unittest.TestCase):
+    """Test Logger.bind()."""
+
+    # Setup and teardown:
+    def setUp(self):
+        self.stream = StringIO()
+        with mock.patch("sys.stderr", self.stream):
+            self.logger = logworks.ConsoleLogger(
+                which_logger="TestBind",
+                use_color=False,
+                console_formatter=logworks.get_formatter(format="{clevelname} {request_id} {job}: {message}",
+                                                         compiled=True),
+            )
+
+    def tearDown(self):
+        self.logger.close()
+
+    # Tests:
+    def test_bind(self):
+        # Prepare:
+        child = self.logger.bind(request_id="r1", job="j1")
+
+        # Run:
+        child.info("one")
+        child.bind(job="j2").ok("two")
+
+        # Assert:
+        self.assertEqual(self.stream.getvalue(), "[INFO] r1 j1: one\n[OK] r1 j2: two\n")
+        self.assertIsInstance(child, logworks.BoundLogger)
+        self.assertIs(child.handlers, self.logger.handlers)
+        self.assertEqual(child._bound, {"request_id": "r1", "job": "j1"})
+
+    def test_extras(self):
+        # Run:
+        child = self.logger.bind(request_id="r1").bind(job="j1")
+
+        # Assert:
+        extra = child._extra("error")
+        self.assertEqual(dict(extra), {"clevelname": "[ERROR]", "lwlevel": "error", "request_id": "r1",
+                                       "job": "j1", "lwbound": ("request_id", "job")})
+        self.assertIs(child._extra("error"), extra)  # built once
+
+    def test_follows_conf(self):
+        # Prepare:
+        child = self.logger.bind(request_id="r1")
+        child.info("before")
+
+        # Run:
+        self.logger.conf = {"colorize": True, "colors": {"info": 99}}
+        self.logger.no_color = False
+
+        # Assert:
+        self.assertEqual(child._extra("info")["clevelname"], self.logger.tags["info"])
+        self.assertIn("99", child._extra("info")["clevelname"])
+        self.assertEqual(child._extra("info")["request_id"], "r1")
+
+    def test_rate_limited(self):
+        # Prepare:
+        logger = logworks.Logger(which_logger="TestBindRateLimit", console_output=False, file_output=False,
+                                 capture=100, rate_limit={"rate": 0.001, "burst": 2, "interval": 3600})
+        child = logger.bind(request_id="r1")
+
+        # Run:
+        for i in range(5):
+            child.warning("again %d", i)
+        logger.close()
+
+        # Assert:
+        messages = [r.message for r in logger.captured()]
+        self.assertEqual(messages[:2], ["again 0", "again 1"])
+        self.assertRegex(messages[2], r"^Suppressed 3 similar messages, from .*test_logworks.py:\d+: again %d$")
+        self.assertEqual(len(messages), 3)
+
+    def test_copy(self):
+        # Prepare:
+        child = self.logger.bind(request_id="r1", job="j1")
+
+        # Run:
+        copied = copy.copy(child)
+        copied.info("copied")
+
+        # Assert:
+        self.assertIs(copied._parent, self.logger)
+        self.assertEqual(self.stream.getvalue(), "[INFO] r1 j1: copied\n")
+
+    def test_unset_attributes(self):
+        # Prepare:
+        child = logworks.BoundLogger.__new__(logworks.BoundLogger)
+
+        # Assert:
+        with self.assertRaises(AttributeError):
+            child.logger
+
+    def test_timed(self):
+        # Run:
+        with self.logger.bind(request_id="r1", job="j1").timed("block", level="info"):
+            pass
+
+        # Assert:
+        self.assertRegex(self.stream.getvalue(), r"^\[INFO\] r1 j1: block took \d+\.\d{3} ms\n$")
+
+    def test_reserved(self):
+        # Assert:
+        for name in ("message", "name", "lwlevel"):
+            with self.assertRaises(ValueError):
+                self.logger.bind(**{name: 1})
+
+    def test_follows_level(self):
+        # Prepare:
+        child = self.logger.bind(request_id="r1", job="j1")
+
+        # Run:
+        self.logger.set_level(logging.ERROR)
+        child.warning("hidden")
+        self.logger.set_level(logging.DEBUG)
+        child.debug("shown")
+
+        # Assert:
+        self.assertEqual(self.stream.getvalue(), "[DEBUG] r1 j1: shown\n")
+
+    def test_child_close(self):
+        # Prepare:
+        child = self.logger.bind(request_id="r1", job="j1")
+
+        # Run:
+        child.close()
+        self.logger.bind(request_id="r2", job="j2").info("still open")
+
+        # Assert:
+        self.assertIs(child._parent, self.logger)
+        self.assertEqual(self.stream.getvalue(), "[INFO] r2 j2: still open\n")
+        self.assertEqual(len(self.logger.logger.handlers), 1)
+
+
+class TestJsonFormatter(unittest.TestCase):
+    """Test JsonFormatter(), and get_json_formatter()."""
+
+    # Setup and teardown:
+    def setUp(self):
+        self.formatter = logworks.get_json_formatter()
+
+    # Tests:
+    def test_format(self):
+        # Prepare:
+        record = logworks.make_record("TestJson", logging.INFO, "ok", 1760702400.25, 'say "%s"\n', ("ñ",))
+
+        # Run:
+        line = self.formatter.format(record)
+
+        # Assert:
+        self.assertNotIn("\n", line)
+        data = json.loads(line)
+        self.assertEqual(list(data), ["time", "level", "name", "message"])
+        self.assertEqual(data["level"], "ok")
+        self.assertEqual(data["name"], "TestJson")
+        self.assertEqual(data["message"], 'say "ñ"\n')
+        self.assertRegex(data["time"], r"^\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.250[+-]\d\d:\d\d$")
+        self.assertEqual(time.mktime(time.strptime(data["time"][:19], "%Y-%m-%dT%H:%M:%S")), 1760702400)
+
+    def test_epoch(self):
+        # Prepare:
+        formatter = logworks.get_json_formatter(time_format="epoch")
+        record = logworks.make_record("TestJson", logging.ERROR, None, 1760702400.25, "boom")
+
+        # Run:
+        data = json.loads(formatter.format(record))
+
+        # Assert:
+        self.assertEqual((data["time"], data["level"]), (1760702400.25, "error"))
+
+    def test_unknown_time_format(self):
+        # Assert:
+        with self.assertRaises(ValueError):
+            logworks.get_json_formatter(time_format="rfc")
+
+    def test_exception(self):
+        # Prepare:
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            record = logging.makeLogRecord({"name": "TestJson", "msg": "failed", "exc_info": sys.exc_info()})
+
+        # Run:
+        data = json.loads(self.formatter.format(record))
+
+        # Assert:
+        self.assertIn("ZeroDivisionError", data["exc_info"])
+
+    def test_logger_output(self):
+        # Prepare:
+        stream = StringIO()
+        with mock.patch("sys.stderr", stream):
+            logger = logworks.ConsoleLogger(which_logger="TestJsonLogger", use_color=True,
+                                            console_formatter=self.formatter)
+        child = logger.bind(request_id="r1", attempt=2, tags=["a"], obj=object)
+
+        # Run:
+        logger.warning("plain")
+        child.ok("bound")
+        logger.close()
+
+        # Assert:
+        self.assertNotIn("\x1b", stream.getvalue())
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(lines[0]["level"], "warning")
+        self.assertNotIn("request_id", lines[0])
+        self.assertEqual([lines[1][k] for k in ("level", "message", "request_id", "attempt", "tags", "obj")],
+                         ["ok", "bound", "r1", 2, ["a"], str(object)])
+
+
+class TestStats(unittest.TestCase):
+    """Test Logger(stats=True)."""
+
+    # Setup and teardown:
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.logfile = os.path.join(self.tmpdir.name, "stats.log")
+        with mock.patch("sys.stderr", StringIO()):
+            self.logger = logworks.Logger(
+                which_logger="TestStats",
+                logfile=self.logfile,
+                level=logging.DEBUG,
+                use_color=False,
+                console_formatter=logworks.get_formatter(format="{message}"),
+                file_formatter=logworks.get_formatter(format="{message}"),
+                stats=True,
+            )
+
+    def tearDown(self):
+        self.logger.close()
+        self.tmpdir.cleanup()
+
+    # Tests:
+    def test_no_stats(self):
+        # Run:
+        with mock.patch("sys.stderr"):
+            logger = logworks.Logger(which_logger="test_no_stats", file_output=False)
+
+        # Assert:
+        self.assertIsNone(logger.stats())
+
+    def test_counts(self):
+        # Run:
+        self.logger.debug("a")
+        self.logger.ok("b")
+        self.logger.ok("c")
+        self.logger.error("d")
+
+        # Assert:
+        counts = self.logger.stats()["counts"]
+        self.assertEqual(counts, {"debug": 1, "info": 0, "ok": 2, "warning": 0, "error": 1})
+
+    def test_bytes_not_chars(self):
+        # Run:
+        self.logger.info("ñ€")
+
+        # Assert:
+        console, logfile = self.logger.stats()["handlers"]
+        self.assertEqual(console["bytes"], 6)
+        self.assertEqual(logfile["bytes"], 6)
+
+    def test_console_encoding(self):
+        # Prepare:
+        stream = io.TextIOWrapper(io.BytesIO(), encoding="latin-1")
+        handler = logworks.ConsoleHandler(stream)
+        handler.setFormatter(logworks.get_formatter(format="{message}"))
+
+        # Run:
+        handler.emit(logworks.make_record("TestStats", logging.INFO, "info", 1000.0, "ñ"))
+
+        # Assert:
+        self.assertEqual(handler.bytes_written, 2)
+
+    def test_handlers(self):
+        # Run:
+        self.logger.info("1234")
+        self.logger.info("5678")
+
+        # Assert:
+        console, logfile = self.logger.stats()["handlers"]
+        self.assertEqual(console["handler"], "ConsoleHandler")
+        self.assertEqual(console["records"], 2)
+        self.assertEqual(console["bytes"], 10)
+        self.assertEqual(logfile["handler"], "PooledFileHandler")
+        self.assertEqual(logfile["target"], self.logfile)
+        self.assertEqual(logfile["bytes"], 10)
+        for handler in (console, logfile):
+            self.assertGreater(handler["emit_ns"], 0)
+            self.assertGreaterEqual(handler["emit_ns"], handler["emit_ns_max"])
+
+    def test_async_dropped(self):
+        # Prepare:
+        logger = logworks.Logger(which_logger="test_async_dropped", console_output=False,
+                                 logfile=self.logfile, async_io=True, stats=True)
+        logger.writer.dropped = 3
+
+        # Run:
+        logger.warning("something")
+        logger.flush()
+        stats = logger.stats()
+
+        # Assert:
+        self.assertEqual(stats["dropped"], 3)
+        self.assertEqual(stats["counts"]["warning"], 1)
+        self.assertEqual([h["handler"] for h in stats["handlers"]], ["BackgroundHandler", "PooledFileHandler"])
+        self.assertEqual(stats["handlers"][1]["records"], 1)
+
+        # Clean:
+        logger.close()
+
+
+class TestCounters(unittest.TestCase):
+    """Test Counters() class."""
+
+    def test_threads(self):
+        # Prepare:
+        counters = logworks.Counters()
+
+        def count():
+            for i in range(1000):
+                counters.add("n")
+                counters.add_max("t", i)
+
+        threads = [threading.Thread(target=count) for _ in range(8)]
+
+        # Run:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Assert:
+        self.assertEqual(counters.snapshot(), {"n": 8000, "t": 8 * 499500, "t_max": 999})
+
+
+class TestQueueLogger(unittest.TestCase):
+    """Test QueueLogger() class."""
+
+    # Setup and teardown:
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.logfile = os.path.join(self.tmpdir.name, "queue.log")
+        self.logger = logworks.QueueLogger(
+            which_logger="TestQueueLogger",
+            console_output=False,
+            logfile=self.logfile,
+            level=logging.DEBUG,
+            file_formatter=logworks.get_formatter(format="{levelname} {message}"),
+        )
+
+    def tearDown(self):
+        self.logger.close()
+        self.tmpdir.cleanup()
+
+    # Tests:
+    def test_constructor(self):
+        # Run:
+        logger = self.logger
+
+        # Assert:
+        self.assertIsInstance(logger.writer, logworks.BackgroundHandler)
+        self.assertEqual(logger.logger.handlers, [logger.writer])
+        self.assertEqual(len(logger.writer.handlers), 1)
+
+    def test_flush_writes_everything_in_order(self):
+        # Run:
+        for i in range(100):
+            self.logger.info("line %d", i)
+        self.logger.flush()
+
+        # Assert:
+        with open(self.logfile) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines, ["INFO line {i}".format(i=i) for i in range(100)])
+
+    def test_close_writes_and_stops(self):
+        # Run:
+        self.logger.warning("last words")
+        self.logger.close()
+
+        # Assert:
+        with open(self.logfile) as f:
+            self.assertEqual(f.read(), "WARNING last words\n")
+        self.assertFalse(self.logger.writer._thread.is_alive())
+        self.assertEqual(self.logger.logger.handlers, [])
+
+    def test_async_io_mode(self):
+        # Run:
+        logger = logworks.Logger(which_logger="test_async_io_mode", console_output=False,
+                                 file_output=False, async_io=True)
+
+        # Assert:
+        self.assertIsInstance(logger.writer, logworks.BackgroundHandler)
+
+        # Clean:
+        logger.close()
+
+    def test_bad_overflow(self):
+        with self.assertRaises(ValueError):
+            logworks.BackgroundHandler([], overflow="whatever")
+
+
+class TestBackgroundHandler(unittest.TestCase):
+    """Test overflow policies of BackgroundHandler() class."""
+
+    # Helper methods:
+    def make_handler(self, overflow):
+        """Return a BackgroundHandler() with room for 3 records, and a target handler which
+        blocks its first write until self.go is set. The first record must be logged
+        (and taken by the writer) before the queue is filled.
+        """
+        self.go = threading.Event()
+        self.written = []
+        taken = threading.Event()
+
+        class Target(logging.Handler):
+            def emit(target, record):
+                taken.set()
+                self.go.wait()
+                self.written.append(record.msg)
+
+        handler = logworks.BackgroundHandler([Target()], queue_size=3, overflow=overflow)
+        handler.handle(self.record(logging.INFO, "first"))
+        taken.wait()
+
+        return handler
+
+    @staticmethod
+    def record(level, msg):
+        return logging.makeLogRecord({"levelno": level, "msg": msg})
+
+    # Tests:
+    def test_drop_oldest(self):
+        # Prepare:
+        handler = self.make_handler("drop_oldest")
+
+        # Run:
+        for i in range(5):
+            handler.handle(self.record(logging.INFO, i))
+        self.go.set()
+        handler.close()
+
+        # Assert:
+        self.assertEqual(self.written, ["first", 2, 3, 4])
+        self.assertEqual(handler.dropped, 2)
+
+    def test_drop_debug(self):
+        # Prepare:
+        handler = self.make_handler("drop_debug")
+
+        # Run:
+        handler.handle(self.record(logging.DEBUG, "d1"))
+        handler.handle(self.record(logging.INFO, "i1"))
+        handler.handle(self.record(logging.DEBUG, "d2"))
+        handler.handle(self.record(logging.ERROR, "e1"))  # d1 goes
+        handler.handle(self.record(logging.DEBUG, "d3"))  # d2 goes
+        handler.handle(self.record(logging.DEBUG, "d4"))  # d3 goes
+        self.go.set()
+        handler.close()
+
+        # Assert:
+        self.assertEqual(self.written, ["first", "i1", "e1", "d4"])
+        self.assertEqual(handler.dropped, 3)
+
+    def test_block(self):
+        # Prepare:
+        handler = self.make_handler("block")
+        for i in range(3):
+            handler.handle(self.record(logging.INFO, i))
+
+        # Run:
+        producer = threading.Thread(target=handler.handle, args=(self.record(logging.INFO, 3),))
+        producer.start()
+        producer.join(0.1)
+        blocked = producer.is_alive()
+        self.go.set()
+        producer.join()
+        handler.close()
+
+        # Assert:
+        self.assertTrue(blocked)
+        self.assertEqual(self.written, ["first", 0, 1, 2, 3])
+        self.assertEqual(handler.dropped, 0)
+
+
+class TestMain(unittest.TestCase):
+    """Test stuff outside Logger() class."""
+
+    # Setup and teardown:
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        if os.path.isfile("logworks.log"):
+            os.unlink("logworks.log")
+
+    # Test version:
+    @unittest.skip("is this test impossible?")
+    def test_version_ok(self):
+        self.assertIsInstance(logworks.__version__, str)
+
+    def test_version_ko(self):
+        # Prepare:
+        from importlib import metadata
+        logworks.__dict__.pop("__version__", None)
+
+        # Run:
+        with mock.patch("importlib.metadata.version", side_effect=metadata.PackageNotFoundError):
+            version = logworks.__version__
+
+        # Assert:
+        self.assertIsNone(version)
+        self.assertIn("__version__", logworks.__dict__)  # cached
+
+        # Clean:
+        logworks.__dict__.pop("__version__", None)
+
+    def test_version_is_lazy(self):
+        # Prepare:
+        logworks.__dict__.pop("__version__", None)
+
+        # Run:
+        with mock.patch("importlib.metadata.version", return_value="1.2.3") as version:
+            first = logworks.__version__
+            second = logworks.__version__
+
+        # Assert:
+        self.assertEqual(first, "1.2.3")
+        self.assertEqual(second, "1.2.3")
+        version.assert_called_once_with("logworks")
+
+        # Clean:
+        logworks.__dict__.pop("__version__", None)
+
+    def test_unknown_attribute(self):
+        with self.assertRaises(AttributeError):
+            logworks.whatever
+
+    # Other:
+    def test_get_formatter_default(self):
+        # Run:
+        fmt = logworks.get_formatter()
+
+        # Assert:
+        self.assertIsInstance(fmt, logging.Formatter)
+
+    def test_get_formatter_compiled(self):
+        # Run:
+        fmt = logworks.get_formatter(compiled=True)
+
+        # Assert:
+        self.assertIsInstance(fmt, logworks.CompiledFormatter)
+        self.assertIsInstance(fmt, logging.Formatter)
+
+    def test_compiled_formatter_same_output(self):
+        # Prepare:
+        templates = [
+            logworks.DEFAULT_CONSOLE_FORMAT,
+            logworks.DEFAULT_FILE_FORMAT,
+            "{clevelname} - {asctime} - {message}",
+            "{levelname:>8} {name!r} {{literal}} {lineno:05d} {message}",
+            "{asctime}|{msecs:03.0f}|{message}\n",
+            "{0} positional falls back",
+        ]
+        record = logging.LogRecord("test", logging.INFO, __file__, 12, "a %s message", ("nice",), None)
+        record.clevelname = logworks.Logger.colorize("[INFO]", 34)
+
+        for template in templates:
+            for date_format in ("%Y-%m-%d %H:%M:%S", "%H:%M", None):
+                stdlib = logging.Formatter(template, date_format, style="{")
+                compiled = logworks.CompiledFormatter(template, date_format)
+
+                # Run:
+                if template.startswith("{0}"):
+                    with self.assertRaises(IndexError):
+                        compiled.format(record)
+                    continue
+
+                # Assert:
+                self.assertEqual(compiled.format(record), stdlib.format(record))
+                self.assertEqual(compiled.format(record), stdlib.format(record))  # cached date
+
+    def test_compiled_formatter_exception(self):
+        # Prepare:
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError:
+            record = logging.LogRecord("test", logging.ERROR, __file__, 1, "failed", None, sys.exc_info())
+        stdlib = logging.Formatter("{asctime} [{levelname}] {message}", style="{")
+        compiled = logworks.CompiledFormatter("{asctime} [{levelname}] {message}")
+
+        # Assert:
+        self.assertEqual(compiled.format(record), stdlib.format(record))
+
+    def test_compiled_formatter_missing_field(self):
+        # Prepare:
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "text", None, None)
+        compiled = logworks.CompiledFormatter("{clevelname} {message}")
+
+        # Assert:
+        with self.assertRaises(ValueError):
+            compiled.format(record)
+
+    def test_formatter_time_cache(self):
+        # Prepare:
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "text", None, None)
+        record.created = 1000.5
+        formatter = logworks.Formatter("{asctime} {message}", "%Y")
+
+        # Run:
+        with mock.patch("time.strftime", return_value="date") as strftime:
+            first = formatter.formatTime(record, "%Y")
+            second = formatter.formatTime(record, "%Y")
+            record.created += 1
+            third = formatter.formatTime(record, "%Y")
+            fourth = formatter.formatTime(record, "%H")
+
+        # Assert:
+        self.assertEqual([first, second, third, fourth], ["date"] * 4)
+        self.assertEqual(strftime.call_count, 3)
+
+    def test_formatter_same_output(self):
+        # Prepare:
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "text", None, None)
+        for template in ("{asctime} {message}", "{asctime}.{msecs:03.0f} {message}"):
+            for date_format in (logworks.DEFAULT_DATE_FORMAT, None):
+                stdlib = logging.Formatter(template, date_format, style="{")
+                formatter = logworks.Formatter(template, date_format)
+
+                for created in (1000.0, 1000.123, 1000.999, 1001.5):
+                    # Run:
+                    record.created = created
+                    record.msecs = (created - int(created)) * 1000
+
+                    # Assert:
+                    self.assertEqual(formatter.format(record), stdlib.format(record))
+
+    def test_default_formatters(self):
+        for formatter in (logworks.DEFAULT_CONSOLE_FORMATTER, logworks.DEFAULT_FILE_FORMATTER):
+            self.assertIsInstance(formatter, logworks.Formatter)
+
+    def test_compiled_formatter_pickle(self):
+        # Prepare:
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "text", None, None)
+        compiled = logworks.CompiledFormatter("{asctime} [{levelname}] {message}", "%H:%M")
+
+        # Run:
+        copy = pickle.loads(pickle.dumps(compiled))
+
+        # Assert:
+        self.assertIsInstance(copy, logworks.CompiledFormatter)
+        self.assertEqual(copy.format(record), compiled.format(record))
+
+    def test_compile_template_fallback(self):
+        for template in ("{a.b}", "{a[0]}", "{}", "{a:{b}}"):
+            self.assertIsNone(logworks.compile_template(template))
+
+    @unittest.skip("right now, this is useless")
+    def test_get_formatter_custom_format(self):
+        # We use a specific name for logger, to override logger(s) generated in previous tests:
+        fmt = logworks.get_formatter(format='{clevelname} - {message}')
+        logger = logworks.ConsoleLogger(
+            which_logger="test_get_formatter_custom_format",
+            console_formatter=fmt,
+        )
+        ###logger.info("post")
+
+        # Assert:
+        self.assertIsInstance(fmt, logging.Formatter)
+
+
+class TestImportTime(unittest.TestCase):
+    """Regression benchmark: importing logworks must stay cheap."""
+
+    # Maximum cumulative import time of logworks (logging included), in microseconds:
+    MAX_IMPORT_US = 100000
+
+    # Modules that importing logworks must not drag in:
+    HEAVY_MODULES = ("pkg_resources", "importlib.metadata", "asyncio", "multiprocessing", "gzip", "lzma")
+
+    # Helper methods:
+    def import_logworks(self):
+        """Import logworks in a fresh interpreter. Return its cumulative import time (in us)
+        and the set of imported module names.
+        """
+        code = "import sys, src.logworks; print(' '.join(sys.modules))"
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            check=True,
+        )
+        for line in proc.stderr.splitlines():
+            # Lines look like "import time:   self [us] |  cumulative | name":
+            fields = [f.strip() for f in line.split("|")]
+            if fields[-1] == "src.logworks":
+                return int(fields[1]), set(proc.stdout.split())
+
+        self.fail("Could not find import time of logworks")
+
+    # Tests:
+    def test_import_time(self):
+        # Run (best of three, to tame noise):
+        best = min(self.import_logworks()[0] for _ in range(3))
+
+        # Assert:
+        self.assertLess(best, self.MAX_IMPORT_US)
+
+    def test_no_heavy_imports(self):
+        # Run:
+        _, modules = self.import_logworks()
+
+        # Assert:
+        for name in self.HEAVY_MODULES:
+            self.assertNotIn(name, modules)
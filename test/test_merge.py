@@ -0,0 +1,86 @@
+# Standard libs:
+import os
+import mock
+import tempfile
+import unittest
+from io import StringIO
+
+# Our libs:
+from src import merge
+
+
+# Globals:
+FIRST = [
+    "2026-10-17 14:00:00 [INFO] a1",
+    "2026-10-17 14:00:02 [ERROR] a2",
+    "Traceback (most recent call last):",
+    "  a2 details",
+    "2026-10-17 14:00:04 [INFO] a3",
+]
+SECOND = [
+    "2026-10-17 14:00:01 [DEBUG] b1",
+    "2026-10-17 14:00:02 [WARNING] b2",
+    "2026-10-17 14:00:05 [ERROR] b3",
+]
+
+
+# Classes:
+class TestMerge(unittest.TestCase):
+    """Test merging of log files."""
+
+    # Setup and teardown:
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.paths = []
+        for i, lines in enumerate((FIRST, SECOND)):
+            path = os.path.join(self.tmpdir.name, "worker-{i}.log".format(i=i))
+            with open(path, "w") as f:
+                f.write("\n".join(lines) + "\n")
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    # Tests:
+    def test_merge(self):
+        # Run:
+        records = list(merge.merge(self.paths))
+
+        # Assert:
+        self.assertEqual([r.message.split("\n")[0] for r in records], ["a1", "b1", "a2", "b2", "a3", "b3"])
+        self.assertEqual(records[2].message, "a2\nTraceback (most recent call last):\n  a2 details")
+
+    def test_merge_levels(self):
+        # Run:
+        records = list(merge.merge(self.paths, levels=["ERROR", "warning"]))
+
+        # Assert:
+        self.assertEqual([r.level for r in records], ["error", "warning", "error"])
+
+    def test_merge_is_lazy(self):
+        # Prepare:
+        with mock.patch("src.reader.read", side_effect=lambda *args: iter(())) as read:
+            # Run:
+            records = merge.merge(self.paths)
+
+            # Assert:
+            self.assertEqual(read.call_count, 2)
+            self.assertEqual(list(records), [])
+
+    def test_main(self):
+        # Prepare:
+        output = os.path.join(self.tmpdir.name, "all.log")
+
+        # Run:
+        merge.main(self.paths + ["-o", output])
+        with mock.patch("sys.stdout", new_callable=StringIO) as stdout:
+            merge.main(self.paths + ["-l", "error"])
+
+        # Assert:
+        with open(output) as f:
+            self.assertEqual(f.read().splitlines(), [FIRST[0], SECOND[0]] + FIRST[1:4] + [SECOND[1], FIRST[4], SECOND[2]])
+        self.assertEqual(stdout.getvalue().splitlines(), FIRST[1:4] + [SECOND[2]])
+
+
+if __name__ == "__main__":
+    unittest.main()
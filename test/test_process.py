@@ -0,0 +1,198 @@
+# Standard libs:
+import os
+import json
+import mock
+import logging
+import tempfile
+import unittest
+import multiprocessing
+
+# Our libs:
+from src import logworks
+from src import process
+
+
+# Functions:
+def log_lines(queue, which, number):
+    """Log 'number' lines through a ProcessLogger using 'queue' (run in worker processes)."""
+
+    logger = process.ProcessLogger(queue=queue, which_logger="TestProcessLoggerWorker")
+    for i in range(number):
+        logger.info("worker %d line %d", which, i)
+    logger.close()
+
+
+def init_pool_worker(queue):
+    """Create the ProcessLogger used by log_in_pool() (run in each pool worker)."""
+
+    global pool_logger
+    pool_logger = process.ProcessLogger(queue=queue, which_logger="TestProcessLoggerPool")
+
+
+def log_in_pool(which):
+    """Log a few lines through the ProcessLogger of this pool worker, and do not close it."""
+
+    for i in range(400):
+        pool_logger.info("task %d line %d", which, i)
+
+
+# Classes:
+class TestProcessLogger(unittest.TestCase):
+    """Test ProcessLogger() class."""
+
+    # Setup and teardown:
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.logfile = os.path.join(self.tmpdir.name, "process.log")
+        self.logger = process.ProcessLogger(logfile=self.logfile, which_logger="TestProcessLogger")
+
+    def tearDown(self):
+        self.logger.close()
+        self.tmpdir.cleanup()
+
+    # Helper methods:
+    def read_lines(self):
+        with open(self.logfile) as f:
+            return f.read().splitlines()
+
+    # Tests:
+    def test_constructor(self):
+        # Assert:
+        self.assertTrue(self.logger.writer_process.is_alive())
+        self.assertIn(self.logger.sender, self.logger.logger.handlers)
+
+    def test_close_drains(self):
+        # Run:
+        self.logger.debug("one")
+        self.logger.ok("two")
+        self.logger.close()
+
+        # Assert:
+        self.assertFalse(self.logger.writer_process.is_alive())
+        self.assertEqual([line.split(" ", 2)[2] for line in self.read_lines()], ["[DEBUG] one", "[INFO] two"])
+
+    def test_many_processes(self):
+        # Prepare:
+        workers = [
+            multiprocessing.Process(target=log_lines, args=(self.logger.queue, i, 200))
+            for i in range(4)
+        ]
+
+        # Run:
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.logger.close()
+
+        # Assert:
+        lines = self.read_lines()
+        self.assertEqual(len(lines), 800)
+        for i in range(4):
+            mine = [line for line in lines if " worker {i} ".format(i=i) in line]
+            self.assertEqual([line.rsplit(" ", 1)[1] for line in mine], [str(n) for n in range(200)])
+
+    def test_pool_terminated(self):
+        # Run (leaving the with block terminates the workers, right after the last task):
+        with multiprocessing.Pool(8, initializer=init_pool_worker, initargs=(self.logger.queue,)) as pool:
+            pool.map(log_in_pool, range(16))
+        self.logger.close()
+
+        # Assert:
+        self.assertEqual(len(self.read_lines()), 6400)
+
+    def test_json_formatter(self):
+        # Prepare:
+        self.logger.close()
+        self.logger = process.ProcessLogger(logfile=self.logfile, which_logger="TestProcessLoggerJson",
+                                            file_formatter=logworks.get_json_formatter(time_format="epoch"))
+
+        # Run:
+        self.logger.ok("done")
+        self.logger.close()
+
+        # Assert:
+        record = json.loads(self.read_lines()[0])
+        self.assertEqual((record["level"], record["name"], record["message"]), ("ok", "TestProcessLoggerJson", "done"))
+
+    def test_exception(self):
+        # Run:
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError:
+            self.logger.logger.exception("failed")
+        self.logger.close()
+
+        # Assert:
+        lines = self.read_lines()
+        self.assertTrue(lines[0].endswith("[ERROR] failed"))
+        self.assertEqual(lines[-1], "RuntimeError: boom")
+
+
+    def test_same_as_file_logger(self):
+        # Prepare:
+        text_path = os.path.join(self.tmpdir.name, "text.log")
+        file_logger = logworks.FileLogger(logfile=text_path, which_logger="TestProcessLoggerSame")
+
+        # Run:
+        for logger in (self.logger.logger, file_logger.logger):
+            logger.info("with stack", stack_info=True)
+            try:
+                raise RuntimeError("boom")
+            except RuntimeError:
+                logger.exception("ends in newline\n")
+        file_logger.close()
+        self.logger.close()
+
+        # Assert (but for dates and call stacks):
+        with open(text_path) as f:
+            expected = [line[20:] if line[:1].isdigit() else line for line in f.read().splitlines()
+                        if not line.startswith(" ")]
+        lines = [line[20:] if line[:1].isdigit() else line for line in self.read_lines() if not line.startswith(" ")]
+        self.assertEqual(lines, ["[INFO] with stack", "Stack (most recent call last):",
+                                 "[ERROR] ends in newline", "Traceback (most recent call last):", "RuntimeError: boom"])
+        self.assertEqual(lines, expected)
+
+
+class TestStopWriter(unittest.TestCase):
+    """Test stop_writer() function."""
+
+    def test_timeout(self):
+        # Prepare:
+        queue = mock.Mock()
+        writer = mock.Mock()
+        writer.is_alive.return_value = True  # never finishes
+
+        # Run:
+        process.stop_writer(queue, writer, os.getpid(), timeout=0.1)
+
+        # Assert:
+        queue.put.assert_called_once_with(None)
+        writer.join.assert_any_call(0.1)
+        writer.terminate.assert_called_once_with()
+
+    def test_not_owner(self):
+        # Prepare:
+        queue = mock.Mock()
+        writer = mock.Mock()
+
+        # Run:
+        process.stop_writer(queue, writer, os.getpid() + 1)
+
+        # Assert:
+        queue.put.assert_not_called()
+
+
+class TestCompact(unittest.TestCase):
+    """Test compact() function."""
+
+    def test_compact(self):
+        # Prepare:
+        record = logworks.make_record("name", logging.INFO, "ok", 1000.5, "a %s", ("b",))
+
+        # Run:
+        ret = process.compact(record)
+
+        # Assert:
+        self.assertEqual(ret, ("name", logging.INFO, "ok", 1000.5, "a b"))
+        self.assertEqual(logworks.make_record(*ret).getMessage(), "a b")
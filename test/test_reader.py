@@ -0,0 +1,124 @@
+# Standard libs:
+import os
+import mock
+import time
+import logging
+import tempfile
+import unittest
+
+# Our libs:
+from src import logworks
+from src import reader
+
+
+# Classes:
+class TestReader(unittest.TestCase):
+    """Test reading back log files."""
+
+    # Setup and teardown:
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "test.log")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    # Tests:
+    def test_template_regex_cached(self):
+        # Run:
+        first = reader.template_regex("{asctime} {message}")
+        second = reader.template_regex("{asctime} {message}")
+
+        # Assert:
+        self.assertIs(first, second)
+
+    def test_read_default_format(self):
+        # Prepare:
+        logger = logworks.FileLogger(logfile=self.path, which_logger="TestReaderDefault", level=logging.DEBUG)
+        before = int(time.time())
+        logger.debug("first")
+        logger.ok("second\nin two lines")
+        logger.error("third")
+        logger.close()
+
+        # Run:
+        records = list(reader.read(self.path))
+
+        # Assert:
+        self.assertEqual([r.message for r in records], ["first", "second\nin two lines", "third"])
+        self.assertEqual([r.level for r in records], ["debug", "info", "error"])
+        self.assertEqual(records[0].offset, 0)
+        self.assertEqual(records[1].offset, len(records[0].text) + 1)
+        self.assertGreaterEqual(records[0].created, before)
+        self.assertLess(records[0].created, before + 60)
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "".join(r.text + "\n" for r in records))
+
+    def test_read_custom_format(self):
+        # Prepare:
+        template = "{asctime} {clevelname} {name}: {message}"
+        formatter = logworks.get_formatter(format=template, date_format=None, compiled=True)
+        logger = logworks.FileLogger(logfile=self.path, which_logger="TestReaderCustom", file_formatter=formatter)
+        logger.ok("all: good")
+        logger.warning("careful")
+        logger.close()
+
+        # Run:
+        records = list(reader.read(self.path, template=template, date_format=None))
+
+        # Assert:
+        self.assertEqual([(r.level, r.name, r.message) for r in records],
+                         [("ok", "TestReaderCustom", "all: good"), ("warning", "TestReaderCustom", "careful")])
+
+    def test_read_orphan_lines(self):
+        # Prepare:
+        with open(self.path, "w") as f:
+            f.write("continued from before\n2026-10-17 14:00:00 [INFO] message\n")
+
+        # Run:
+        records = list(reader.read(self.path))
+
+        # Assert:
+        self.assertEqual([(r.created, r.level, r.message) for r in records][0], (None, None, "continued from before"))
+        self.assertEqual(records[1].message, "message")
+
+    def test_read_from_offset(self):
+        # Prepare:
+        with open(self.path, "w") as f:
+            f.write("2026-10-17 14:00:00 [INFO] one\n2026-10-17 14:00:01 [INFO] two\n")
+
+        # Run:
+        records = list(reader.read(self.path, offset=31))
+
+        # Assert:
+        self.assertEqual([r.message for r in records], ["two"])
+
+    @mock.patch("src.reader.FOLLOW_INTERVAL", 0.01)
+    def test_follow(self):
+        # Prepare:
+        with open(self.path, "w") as f:
+            f.write("2026-10-17 14:00:00 [INFO] one\n")
+        records = reader.read(self.path, follow=True)
+
+        # Run:
+        first = next(records)
+        with open(self.path, "a") as f:
+            f.write("2026-10-17 14:00:01 [ERROR] two\nTraceback\n")
+        second = next(records)
+
+        with mock.patch("src.reader.open", side_effect=open) as mock_open:
+            os.rename(self.path, self.path + ".1")
+            with open(self.path, "w") as f:
+                f.write("2026-10-17 14:00:02 [INFO] rotated\n")
+            third = next(records)
+        records.close()
+
+        # Assert:
+        self.assertEqual(first.message, "one")
+        self.assertEqual((second.level, second.message), ("error", "two\nTraceback"))
+        self.assertEqual((third.offset, third.message), (0, "rotated"))
+        self.assertEqual(mock_open.call_count, 1)  # reopened only once rotated
+
+
+if __name__ == "__main__":
+    unittest.main()